@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+#
+# test_turing_cache.py
+# Requires: turing_engine.py, turing_registry.py, test_turing_engine.py
+#
+# Checks that runs using a WindowCache give exactly the configurations of
+# single stepping, and that a cache is only used with one program.
+#
+"""
+Usage:
+
+    python3 -m unittest test_turing_cache
+"""
+import unittest
+
+import test_turing_engine
+from turing_engine import TuringEngine, WindowCache
+from turing_registry import get_program
+
+
+class TestWindowCache(test_turing_engine.TestRun):
+    """
+    The tests of TestRun, with a new cache for each run.
+    """
+    def options(self):
+        return ({"cache": WindowCache(width=4)}, {"cache": WindowCache()})
+
+
+    def test_bound_to_program(self):
+        cache = WindowCache()
+        TuringEngine(get_program("inc"), "1011").run(500, cache=cache)
+        TuringEngine(get_program("inc"), "1").run(500, cache=cache)
+        with self.assertRaises(ValueError):
+            TuringEngine(get_program("dec"), "1011").run(500, cache=cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+#
+# test_turing_decide.py
+# Requires: turing_engine.py, turing_registry.py, test_turing_engine.py
+#
+# Checks the verdicts of TuringEngine.decide(): halting, cyclers and
+# translated cyclers, undefined transitions and running out of budget.
+#
+"""
+Usage:
+
+    python3 -m unittest test_turing_decide
+"""
+import random
+import unittest
+
+from turing_engine import (TuringEngine, compile_program, HALTS, LOOPS,
+        UNDEFINED, BUDGET)
+from turing_registry import get_program
+from test_turing_engine import (random_program, random_data, builtin_cases,
+        SEED, MAX_STEPS, RANDOM_PROGRAMS)
+
+
+class TestDecide(unittest.TestCase):
+
+    def test_halts(self):
+        for name, program, data in builtin_cases():
+            engine = TuringEngine(program, data)
+            engine.run(MAX_STEPS)
+            if not engine.halted:
+                continue
+            with self.subTest(name):
+                verdict = TuringEngine(program, data).decide(MAX_STEPS)
+                self.assertEqual(verdict.kind, HALTS)
+                self.assertEqual(verdict.steps, engine.counter)
+
+
+    def test_loops_in_place(self):
+        verdict = TuringEngine({("0", "_"): ("1", "1", "r"),
+                ("1", "_"): ("0", "_", "l"), ("0", "1"): ("1", "1", "r")},
+                "_").decide(1000)
+        self.assertEqual(verdict.kind, LOOPS)
+        self.assertEqual(verdict.shift, 0)
+        self.assertEqual(verdict.period, 2)
+
+
+    def test_loops_translated(self):
+        verdict = TuringEngine({("0", "_"): ("0", "1", "r")}, "_").decide(1000)
+        self.assertEqual(verdict.kind, LOOPS)
+        self.assertEqual(verdict.shift, 1)
+
+
+    def test_undefined_and_budget(self):
+        verdict = TuringEngine({("0", "1"): ("0", "1", "r")}, "11").decide(1000)
+        self.assertEqual(verdict.kind, UNDEFINED)
+        self.assertEqual(verdict.steps, 2)
+        verdict = TuringEngine(get_program("inc"), "1").decide(1000)
+        self.assertEqual(verdict.kind, BUDGET)
+
+
+    def test_loops_are_never_halts(self):
+        rng = random.Random(SEED)
+        for i in range(RANDOM_PROGRAMS):
+            program = compile_program(random_program(rng))
+            data = random_data(rng)
+            verdict = TuringEngine(program, data).decide(2000)
+            engine = TuringEngine(program, data)
+            engine.run(verdict.steps + 5000)
+            with self.subTest(i):
+                if verdict.kind == LOOPS:
+                    self.assertFalse(engine.stopped)
+                elif verdict.kind != BUDGET:
+                    self.assertEqual(engine.counter, verdict.steps)
+
+
+if __name__ == "__main__":
+    unittest.main()
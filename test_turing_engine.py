@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+#
+# test_turing_engine.py
+# Requires: turing_engine.py, turing_registry.py
+#
+# Checks that the fast paths of the engine give exactly the configurations
+# of single stepping. The helpers here are shared by the other test_turing_*
+# modules. Standard library only.
+#
+"""
+Usage:
+
+    python3 -m unittest test_turing_engine
+    python3 -m unittest discover -p "test_turing*.py"   # All of them
+"""
+import random
+import unittest
+
+from turing_engine import TuringEngine, compile_program, BUDGET
+from turing_registry import names, arity, get_program
+
+SEED = 1
+MAX_STEPS = 20000
+RANDOM_PROGRAMS = 1000
+
+# Operands of the built-in programs. Programs without operands are run on a
+# blank tape.
+OPERANDS = {0: "_", 1: "1011", 2: "101_11"}
+
+
+def random_program(rng, states=4, defined=0.85):
+    """
+    A trf dictionary of random transitions. Some are left out, so the
+    machine may stop on an undefined transition.
+    """
+    names = [str(i) for i in range(rng.randint(1, states))]
+    trf = {}
+    for state in names:
+        for symbol in "_01":
+            if rng.random() < defined:
+                trf[state, symbol] = (rng.choice(names + ["h"]),
+                        rng.choice("_01"), rng.choice("lrn"))
+    trf.setdefault(("0", "_"), ("0", "1", "r"))
+    return trf
+
+
+def random_data(rng, length=6):
+    return "".join(rng.choice("_01") for _ in range(rng.randint(1, length)))
+
+
+def configuration(engine):
+    """
+    Everything that single stepping and the fast paths must agree on.
+    """
+    return (engine.state, engine.head, engine.counter, str(engine.tape),
+            engine.tape.ones, engine.undefined)
+
+
+def stepped(program, data, max_steps):
+    """
+    The reference. A new engine, stepped one instruction at a time.
+    """
+    engine = TuringEngine(program, data)
+    for _ in range(max_steps):
+        if not engine.step():
+            break
+    return engine
+
+
+def builtin_cases():
+    for name in names():
+        yield name, get_program(name), OPERANDS[arity(name)]
+
+
+class TestRun(unittest.TestCase):
+
+    def options(self):
+        """
+        The keyword arguments of run() checked against single stepping.
+        """
+        return ({}, {"accelerate": False})
+
+
+    def check(self, program, data, max_steps):
+        expected = configuration(stepped(program, data, max_steps))
+        for options in self.options():
+            engine = TuringEngine(program, data)
+            engine.run(max_steps, **options)
+            self.assertEqual(configuration(engine), expected,
+                    "run({}, {})".format(max_steps, options))
+
+
+    def test_builtin_programs(self):
+        for name, program, data in builtin_cases():
+            with self.subTest(name):
+                self.check(program, data, MAX_STEPS)
+
+
+    def test_long_sweeps(self):
+        """
+        Sweeps over more cells than the first search window, both ways,
+        stopping on one code or on either of two.
+        """
+        right_then_left = {("0", "0"): ("0", "0", "r"), ("0", "1"): ("0", "1", "r"),
+                ("0", "_"): ("1", "_", "l"), ("1", "1"): ("1", "1", "l"),
+                ("1", "0"): ("h", "0", "n"), ("1", "_"): ("h", "_", "n")}
+        over_ones = {("0", "1"): ("0", "1", "r"), ("0", "0"): ("1", "1", "l"),
+                ("1", "1"): ("1", "1", "l"), ("1", "_"): ("h", "_", "r")}
+        for trf, data in ((right_then_left, "0" + "1" * 1000),
+                (right_then_left, "1" * 5000), (over_ones, "1" * 1000 + "0"),
+                (over_ones, "1" * 3000)):
+            with self.subTest(data=data[:8], length=len(data)):
+                self.check(compile_program(trf), data, MAX_STEPS)
+
+
+    def test_random_programs(self):
+        rng = random.Random(SEED)
+        for i in range(RANDOM_PROGRAMS):
+            program = compile_program(random_program(rng))
+            data = random_data(rng)
+            # Small budgets end runs on, and just before, undefined
+            # transitions.
+            with self.subTest(i):
+                self.check(program, data, rng.randint(1, 60))
+
+
+    def test_budget_is_not_undefined(self):
+        rng = random.Random(SEED)
+        for _ in range(RANDOM_PROGRAMS):
+            program = compile_program(random_program(rng))
+            data = random_data(rng)
+            steps = stepped(program, data, MAX_STEPS)
+            if steps.undefined is None:
+                continue
+            # The budget runs out just as the undefined transition is due.
+            for options in self.options():
+                engine = TuringEngine(program, data)
+                engine.run(steps.counter, **options)
+                self.assertIsNone(engine.undefined, options)
+                self.assertEqual(engine.verdict().kind, BUDGET)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+#
+# test_turing_loader.py
+# Requires: turing_engine.py, turing_registry.py, turing_loader.py,
+#           turing_program.py
+#
+# Checks that programs, and their comments, survive being written to and
+# read back from the text and JSON file formats.
+#
+"""
+Usage:
+
+    python3 -m unittest test_turing_loader
+"""
+import unittest
+
+import turing_program
+from turing_engine import compile_program
+from turing_registry import names
+from turing_loader import parse_text, parse_json, format_text, format_json
+
+
+class TestLoader(unittest.TestCase):
+
+    def test_builtin_programs(self):
+        for name in names():
+            trf = getattr(turing_program, "function_" + name)()
+            for parse, format in ((parse_text, format_text),
+                    (parse_json, format_json)):
+                with self.subTest(name=name, format=format.__name__):
+                    self.assertEqual(compile_program(parse(format(trf))).actions,
+                            compile_program(trf).actions)
+
+
+    def test_comments(self):
+        trf = {("0", "c"): "Move right -> end # not a note ",
+                ("0", "0"): ("0", "0", "r"), ("0", "_"): ("h", "_", "n"),
+                ("1", "c"): "Two\nlines, a \\n and a \\",
+                ("1", "1"): ("0", "1", "l")}
+        self.assertEqual(parse_text(format_text(trf)), trf)
+        self.assertEqual(parse_json(format_json(trf)), trf)
+
+
+if __name__ == "__main__":
+    unittest.main()
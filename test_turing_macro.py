@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+#
+# test_turing_macro.py
+# Requires: turing_engine.py, turing_macro.py, turing_program.py,
+#           test_turing_engine.py
+#
+# Checks that the macro machine ends where the TuringEngine does: halted, on
+# an undefined transition, or never halting.
+#
+"""
+Usage:
+
+    python3 -m unittest test_turing_macro
+"""
+import random
+import unittest
+
+import turing_program
+from turing_engine import TuringEngine, compile_program
+from turing_macro import MacroMachine
+from test_turing_engine import random_program, random_data, SEED
+
+MAX_STEPS = 5000
+RANDOM_PROGRAMS = 2000
+
+
+def outcome(machine):
+    return (machine.state, machine.steps, machine.head, machine.tape_string(),
+            machine.undefined)
+
+
+def engine_outcome(engine):
+    return (engine.state, engine.counter, engine.head, str(engine.tape),
+            engine.undefined)
+
+
+class TestMacroMachine(unittest.TestCase):
+
+    def test_busy_beavers(self):
+        for function in (turing_program.function_busy_beaver_3,
+                turing_program.function_busy_beaver_4):
+            engine = TuringEngine(function(), "_")
+            engine.run()
+            for k in (1, 2, 3):
+                machine = MacroMachine(function(), k, "_")
+                machine.run()
+                self.assertTrue(machine.halted)
+                self.assertEqual(outcome(machine), engine_outcome(engine))
+
+
+    def test_random_programs(self):
+        """
+        Total and partial tables. Every run stops as the engine does.
+        """
+        rng = random.Random(SEED)
+        for i in range(RANDOM_PROGRAMS):
+            trf = random_program(rng, defined=rng.choice((0.85, 1)))
+            data = random_data(rng)
+            k = rng.randint(1, 3)
+            machine = MacroMachine(trf, k, data)
+            machine.run(MAX_STEPS)
+            engine = TuringEngine(compile_program(trf), data)
+            with self.subTest(i):
+                if machine.loops:
+                    engine.run(MAX_STEPS)
+                    self.assertFalse(engine.stopped)
+                elif machine.stopped:
+                    engine.run(machine.steps + 1)
+                    self.assertEqual(outcome(machine), engine_outcome(engine))
+
+
+    def test_undefined(self):
+        machine = MacroMachine({("0", "1"): ("0", "1", "r")}, 2, "111")
+        self.assertEqual(machine.run(), 3)
+        self.assertEqual(machine.undefined, ("0", "_"))
+        self.assertEqual((machine.head, machine.tape_string()), (3, "111"))
+        self.assertTrue(machine.stopped)
+        self.assertEqual(machine.run(), 0)
+
+
+    def test_loops_in_block(self):
+        machine = MacroMachine({("0", "_"): ("1", "1", "r"),
+                ("1", "_"): ("0", "_", "l"), ("0", "1"): ("1", "1", "r")}, 2, "_")
+        self.assertEqual(machine.run(), 0)
+        self.assertTrue(machine.loops)
+        self.assertIsNone(machine.undefined)
+        self.assertFalse(machine.halted)
+
+
+if __name__ == "__main__":
+    unittest.main()
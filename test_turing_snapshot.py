@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+#
+# test_turing_snapshot.py
+# Requires: turing_engine.py, turing_registry.py, turing_snapshot.py,
+#           test_turing_engine.py
+#
+# Checks that a snapshot, in memory or in a file, restores the engine to
+# the configuration it was taken from, and that a History steps back and
+# goes to steps exactly.
+#
+"""
+Usage:
+
+    python3 -m unittest test_turing_snapshot
+"""
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from turing_registry import get_program
+from turing_engine import TuringEngine
+from turing_snapshot import (History, snapshot, restore, save_snapshot,
+        load_snapshot)
+from test_turing_engine import configuration, stepped, SEED
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def test_round_trip(self):
+        program = get_program("addition")
+        engine = TuringEngine(program, "1011_111")
+        engine.run(40)
+        copy = restore(snapshot(engine), program)
+        self.assertEqual(configuration(copy), configuration(engine))
+        engine.run()
+        copy.run()
+        self.assertEqual(configuration(copy), configuration(engine))
+
+
+    def test_file(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "run.snap")
+            program = get_program("busy_beaver_4")
+            engine = TuringEngine(program, "_")
+            engine.run(50)
+            save_snapshot(engine, path)
+            self.assertEqual(configuration(load_snapshot(path, program)),
+                    configuration(engine))
+            with self.assertRaises(ValueError):
+                load_snapshot(path, get_program("busy_beaver_3"))
+        finally:
+            shutil.rmtree(directory)
+
+
+class TestHistory(unittest.TestCase):
+
+    def reference(self, program, data, steps):
+        return configuration(stepped(program, data, steps))[:5]
+
+
+    def test_step_back(self):
+        program = get_program("dec")
+        engine = TuringEngine(program, "101101")
+        history = History(engine, 1000, 50)
+        history.attach()
+        engine.run_until(None, 300)
+        for counter in range(engine.counter - 1, engine.counter - 120, -1):
+            self.assertTrue(history.step_back())
+            self.assertEqual(configuration(engine)[:5],
+                    self.reference(program, "101101", counter))
+
+
+    def test_goto(self):
+        rng = random.Random(SEED)
+        program = get_program("inc")
+        for size, every in ((500, 300), (500, 7), (100, 1000), (37, 5)):
+            engine = TuringEngine(program, "1")
+            history = History(engine, size, every)
+            history.attach()
+            engine.run_until(None, 1500)
+            for _ in range(40):
+                target = rng.randint(history.earliest - 5, engine.counter + 20)
+                with self.subTest(size=size, every=every, target=target):
+                    if target < history.earliest:
+                        self.assertFalse(history.goto(target))
+                        continue
+                    self.assertTrue(history.goto(target))
+                    self.assertEqual(configuration(engine)[:5],
+                            self.reference(program, "1", target))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+#
+# test_turing_tape.py
+# Requires: turing_engine.py, test_turing_engine.py
+#
+# Checks that the Tape keeps its edges and first field up to date as it is
+# written, against a brute force scan of the cells.
+#
+"""
+Usage:
+
+    python3 -m unittest test_turing_tape
+"""
+import random
+import unittest
+
+from turing_engine import Tape
+from test_turing_engine import random_data, SEED
+
+
+class TestTape(unittest.TestCase):
+
+    def brute(self, tape):
+        positions = [p for p in range(-300, 300) if tape[p]]
+        if not positions:
+            return None, ""
+        end = positions[0]
+        while tape[end]:
+            end += 1
+        field = "".join("_01"[tape[p]] for p in range(positions[0], end))
+        return (positions[0], positions[-1]), field
+
+
+    def test_edges_and_first_field(self):
+        rng = random.Random(SEED)
+        for _ in range(100):
+            tape = Tape(random_data(rng, 8))
+            for _ in range(200):
+                tape[rng.randint(-20, 20)] = rng.choice((0, 0, 1, 2))
+                extent, field = self.brute(tape)
+                self.assertEqual(tape.extent(), extent)
+                self.assertEqual(tape.first_field(), field)
+
+
+    def test_contents_restore(self):
+        tape = Tape("_101__11_")
+        tape[-5] = 2
+        copy = Tape()
+        copy.restore(*tape.contents())
+        self.assertEqual(copy.contents(), tape.contents())
+        self.assertEqual(copy.first_field(), tape.first_field())
+        self.assertEqual(copy.ones, tape.ones)
+
+
+    def test_read_does_not_grow(self):
+        tape = Tape("_101__11_")
+        size, origin = len(tape.cells), tape.origin
+        for first in range(-size - 40, size + 40, 3):
+            for width in (1, 33, 2 * size):
+                last = first + width - 1
+                self.assertEqual(tape.read(first, last),
+                        bytes(tape[p] for p in range(first, last + 1)))
+        self.assertEqual((len(tape.cells), tape.origin), (size, origin))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+#
+# test_turing_trace.py
+# Requires: turing_engine.py, turing_registry.py, turing_trace.py,
+#           test_turing_engine.py
+#
+# Checks that every configuration rebuilt from a binary trace file is the
+# configuration the engine had at that step, and that notes are written at
+# the SUMMARY level.
+#
+"""
+Usage:
+
+    python3 -m unittest test_turing_trace
+"""
+import io
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from turing_engine import TuringEngine
+from turing_registry import get_program
+from turing_trace import (BinaryTraceSink, TraceReader, TextSink,
+        JsonLinesSink, OFF, SUMMARY, STEP)
+from test_turing_engine import MAX_STEPS
+
+
+class TestTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+
+    def test_configurations(self):
+        path = os.path.join(self.directory, "bb4.trace")
+        program = get_program("busy_beaver_4")
+        engine = TuringEngine(program, "_")
+        sink = BinaryTraceSink(path, keyframe_interval=16)
+        sink.attach(engine)
+        sink.start(engine)
+        engine.run_until(None, MAX_STEPS)
+        sink.finish(engine, engine.verdict())
+        self.assertEqual(sink.level, STEP)
+
+        reader = TraceReader(path)
+        try:
+            self.assertEqual(reader.last, engine.counter)
+            expected = TuringEngine(program, "_")
+            for n in range(reader.first, reader.last + 1):
+                state, head, tape = reader.configuration(n)
+                self.assertEqual((state, head, tape.contents()),
+                        (expected.state, expected.head,
+                        expected.tape.contents()), n)
+                expected.step()
+        finally:
+            reader.close()
+
+
+    def test_notes(self):
+        for level, expected in ((OFF, ""), (SUMMARY, "Warning\n")):
+            stream = io.StringIO()
+            TextSink(stream, level).note("Warning")
+            self.assertEqual(stream.getvalue(), expected)
+        stream = io.StringIO()
+        JsonLinesSink(stream, SUMMARY).note("Warning")
+        self.assertEqual(json.loads(stream.getvalue()),
+                {"event": "note", "text": "Warning"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+#
+# turing_batch.py
+# Requires: turing_registry.py, turing_engine.py
+#
+# Run a calculator program over a whole range of operands, in parallel, and
+# save the output tape, step count, halts/undefined/timeout status and wall
+# time of every run as columns in a JSON file.
+#
+"""
+Usage:
+
+    python3 turing_batch.py + 0 4095 -o addition.json
+    python3 turing_batch.py Dec 0 100000 --max-steps 1000000
+
+The program is a calculator button label (Inc, Dec, +, BB3...) or the name
+of a turing_program.py function without the "function_" prefix (addition,
+dec1...). Unary programs are run on every operand from first to last.
+Binary programs are run on every pair of operands. Programs without
+operands are run once.
+
+The result file holds one list per column:
+
+    {"program": "addition", "max_steps": 100000, "columns": {
+        "operand_1": [...], "operand_2": [...], "tape": [...],
+        "result": [...], "steps": [...], "status": [...], "seconds": [...]}}
+"""
+import sys
+import os
+import time
+import json
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from turing_engine import (TuringEngine, STATUS_NAME, HALTS, UNDEFINED,
+        BUDGET)
+from turing_registry import get_program, program_name, arity
+
+MAX_STEPS = 100000
+CHUNK_SIZE = 256
+
+COLUMNS = ("operand_1", "operand_2", "tape", "result", "steps", "status",
+        "seconds")
+
+
+def tape_data(operands):
+    """
+    The initial tape for the operands. Binary, separated by underscores.
+    """
+    return "_".join(bin(operand)[2:] for operand in operands)
+
+
+def run_chunk(name, chunk, max_steps):
+    """
+    Run the program on each tuple of operands in chunk.
+    Returns a list of rows, one per run, in the order of COLUMNS.
+    """
+    # Each worker compiles the program once, on its first chunk.
+    program = get_program(name)
+    engine = TuringEngine(program)
+    rows = []
+    for operands in chunk:
+        start = time.perf_counter()
+        engine.load(program, tape_data(operands))
+        steps = engine.run(max_steps)
+        seconds = time.perf_counter() - start
+
+        field = engine.tape.first_field()
+        padded = tuple(operands) + (None,) * (2 - len(operands))
+        rows.append(padded + (
+                str(engine.tape),
+                int(field, 2) if field else None,
+                steps,
+                status(engine),
+                seconds))
+    return rows
+
+
+def status(engine):
+    """
+    "halts", "undefined" (no transition for the state and symbol read) or
+    "timeout", as in turing_run.py and turing_vector.py.
+    """
+    return STATUS_NAME[engine.verdict().kind]
+
+
+def sweep(name, first, last, max_steps=MAX_STEPS, workers=None,
+        chunk_size=CHUNK_SIZE):
+    """
+    Run a program on every operand (or pair of operands) from first to last
+    inclusive, over a pool of worker processes.
+    Returns a dictionary of columns.
+    """
+    name = program_name(name)
+    operand_range = range(first, last + 1)
+    operands = arity(name)
+    if operands == 0:
+        inputs = iter([()])
+    else:
+        inputs = itertools.product(operand_range, repeat=operands)
+
+    columns = {column: [] for column in COLUMNS}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = iter(lambda: list(itertools.islice(inputs, chunk_size)), [])
+        futures = (executor.submit(run_chunk, name, chunk, max_steps)
+                for chunk in chunks)
+        # Keep a bounded number of chunks in flight.
+        pending = list(itertools.islice(futures, 4 * (workers or os.cpu_count() or 1)))
+        while pending:
+            for row in pending.pop(0).result():
+                for column, value in zip(COLUMNS, row):
+                    columns[column].append(value)
+            pending.extend(itertools.islice(futures, 1))
+    return columns
+
+
+def save_columns(path, name, max_steps, columns):
+    """
+    Write the columns to a JSON file.
+    """
+    with open(path, "w") as f:
+        json.dump({"program": program_name(name), "max_steps": max_steps,
+                "columns": columns}, f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+            description="Run a Turing program over a range of operands.")
+    parser.add_argument("program", help="E.g. +, Dec, addition, dec1")
+    parser.add_argument("first", type=int, help="First operand value")
+    parser.add_argument("last", type=int, help="Last operand value")
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS,
+            help="Step budget per run (default {})".format(MAX_STEPS))
+    parser.add_argument("--workers", type=int, default=None,
+            help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE,
+            help="Runs per work unit (default {})".format(CHUNK_SIZE))
+    parser.add_argument("-o", "--output", default="turing_batch.json",
+            help="Result file (default turing_batch.json)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    columns = sweep(args.program, args.first, args.last, args.max_steps,
+            args.workers, args.chunk)
+    seconds = time.perf_counter() - start
+    save_columns(args.output, args.program, args.max_steps, columns)
+
+    runs = len(columns["steps"])
+    print("Runs: {}, halts: {}, undefined: {}, timeout: {}, steps: {}, "
+            "{:.2f} s, {:.0f} runs/s".format(runs,
+            columns["status"].count(STATUS_NAME[HALTS]),
+            columns["status"].count(STATUS_NAME[UNDEFINED]),
+            columns["status"].count(STATUS_NAME[BUDGET]), sum(columns["steps"]),
+            seconds, runs / seconds if seconds else 0))
+    print("Results written to {}".format(args.output))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+#
+# turing_beaver.py
+# Requires: turing_engine.py
+#
+# Enumerate every n-state, 2-symbol (underscore and 1) Turing machine in tree
+# normal form, run each one on a blank tape with a step budget and report the
+# busy beaver leaders. Subtrees of the enumeration are spread over a pool of
+# worker processes.
+#
+"""
+Tree normal form: a machine starts with no transitions. It is run until it
+reads a state and symbol that has no transition. Only then is that
+transition filled in, once for each choice of write, move and next state,
+and each child machine carries on from where its parent stopped.
+
+Next states are limited to the states already used plus one new state, so
+machines that differ only by the numbering of their states are generated
+once. The first move is always right, so mirror images are skipped.
+
+Machines that provably never halt, because their configuration repeats,
+perhaps shifted along the tape, are counted as looping and are not expanded.
+Those that reach the step budget are undecided.
+
+Reaching an undefined transition also gives a halting machine: make that
+transition write 1 and halt. Its score is the number of ones on the tape
+and its steps include the halting step.
+
+Usage:
+
+    python3 turing_beaver.py 3
+    python3 turing_beaver.py 4 --max-steps 2000 --workers 8 -o undecided.txt
+
+Machines are written in the usual notation. E.g. the 2 state champion:
+
+    1RB1LB_1LA1RH
+
+A, B, C... are the states 0, 1, 2... and H is halt. A blank is written
+as 0 in this notation.
+"""
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from turing_engine import (TuringEngine, compile_program, BLANK, HALT,
+        COMMENT, LOOPS)
+
+MAX_STEPS = 1000
+
+# Symbols of a 2-symbol machine. Underscore is the blank.
+SYMBOLS_2 = (BLANK, "1")
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def format_machine(trf, n):
+    """
+    Return a machine in the usual notation. E.g. 1RB1LB_1LA1RH
+    Undefined transitions are written as ---.
+    """
+    groups = []
+    for state in range(n):
+        s = ""
+        for symbol in SYMBOLS_2:
+            action = trf.get((str(state), symbol))
+            if action is None:
+                s += "---"
+                continue
+            q, Y, D = action
+            s += "{}{}{}".format(Y.replace(BLANK, "0"), D.upper(),
+                    "H" if q == HALT else LETTERS[int(q)])
+        groups.append(s)
+    return "_".join(groups)
+
+
+def children(trf, n, slot):
+    """
+    Yield each machine with the undefined transition, slot, filled in.
+    Next states are those already used and one new state.
+    """
+    used = {int(k[0]) for k in trf} | {int(v[0]) for v in trf.values()
+            if v[0] != HALT} | {int(slot[0])}
+    new = max(used) + 1
+    for q in range(min(new + 1, n)):
+        for Y in SYMBOLS_2:
+            for D in ("r", "l"):
+                child = dict(trf)
+                child[slot] = (str(q), Y, D)
+                yield child
+
+
+class Results:
+    """
+    Totals and leaders found in a search.
+    """
+    def __init__(self):
+        self.machines = 0
+        self.halting = 0
+        self.looping = 0
+        self.undecided = []
+        self.score = -1
+        self.score_leaders = []
+        self.steps = -1
+        self.step_leaders = []
+
+
+    def add_halting(self, name, score, steps):
+        self.halting += 1
+        if score > self.score:
+            self.score, self.score_leaders = score, []
+        if score == self.score:
+            self.score_leaders.append(name)
+        if steps > self.steps:
+            self.steps, self.step_leaders = steps, []
+        if steps == self.steps:
+            self.step_leaders.append(name)
+
+
+    def merge(self, other):
+        self.machines += other.machines
+        self.halting += other.halting
+        self.looping += other.looping
+        self.undecided.extend(other.undecided)
+        if other.score > self.score:
+            self.score, self.score_leaders = other.score, []
+        if other.score == self.score:
+            self.score_leaders.extend(other.score_leaders)
+        if other.steps > self.steps:
+            self.steps, self.step_leaders = other.steps, []
+        if other.steps == self.steps:
+            self.step_leaders.extend(other.step_leaders)
+
+
+def compile_machine(trf, n):
+    """
+    Compile a machine. A comment is added for each of the n states, so that
+    states without transitions yet still exist.
+    """
+    program = {(str(state), COMMENT): "State " + LETTERS[state]
+            for state in range(n)}
+    program.update(trf)
+    return compile_program(program)
+
+
+def start(trf, n, max_steps):
+    """
+    Run a machine from a blank tape. Returns the engine, stopped, and the
+    Verdict.
+    """
+    engine = TuringEngine(compile_machine(trf, n), BLANK)
+    return engine, engine.decide(max_steps)
+
+
+def resume(parent, trf, n, max_steps):
+    """
+    Continue a child machine from where its parent stopped, at the
+    transition the child defines. Returns the engine, stopped, and the
+    Verdict.
+    """
+    engine = TuringEngine(compile_machine(trf, n), None, parent.state)
+    engine.tape = parent.tape.copy()
+    engine.head = parent.head
+    engine.counter = parent.counter
+    return engine, engine.decide(max_steps - engine.counter)
+
+
+def search(trf, n, max_steps, depth=None, counted=False):
+    """
+    Depth first search of the tree below a machine.
+    With depth, stop that many levels down and return the unexpanded
+    machines as well: (results, frontier).
+    counted is True when the machine itself is already in another Results.
+    """
+    results = Results()
+    frontier = []
+    stack = [(start(trf, n, max_steps), trf, 0)]
+    while stack:
+        (engine, verdict), trf, level = stack.pop()
+        first = counted and level == 0
+        if not first:
+            results.machines += 1
+        name = format_machine(trf, n)
+
+        if engine.halted:
+            results.add_halting(name, engine.tape.ones, engine.counter)
+            continue
+        if verdict.kind == LOOPS:
+            results.looping += 1
+            continue
+        if engine.undefined is None:
+            results.undecided.append(name)
+            continue
+
+        # Stopped at an undefined transition. Halt there, writing a 1.
+        slot = engine.undefined
+        score = engine.tape.ones + (1 if slot[1] == BLANK else 0)
+        if not first:
+            halted = dict(trf)
+            halted[slot] = (HALT, "1", "r")
+            results.add_halting(format_machine(halted, n), score,
+                    engine.counter + 1)
+
+        # A machine needs at least one transition left over to halt.
+        if len(trf) + 1 >= 2 * n:
+            continue
+        if depth is not None and level == depth:
+            frontier.append(trf)
+            continue
+        for child in children(trf, n, slot):
+            if not trf and child[slot][2] == "l":
+                continue  # Mirror image. First move is right.
+            stack.append((resume(engine, child, n, max_steps), child,
+                    level + 1))
+    return results, frontier
+
+
+def search_subtree(trf, n, max_steps):
+    """
+    Worker process entry point. trf is a machine on the frontier.
+    """
+    return search(trf, n, max_steps, counted=True)[0]
+
+
+def enumerate_machines(n, max_steps=MAX_STEPS, workers=None, split_depth=3):
+    """
+    Enumerate all n-state, 2-symbol machines in tree normal form.
+    The tree is expanded to split_depth in this process, then each subtree
+    below that is searched by a worker process.
+    Returns a Results.
+    """
+    results, frontier = search({}, n, max_steps, split_depth)
+    if not frontier:
+        return results
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(search_subtree, trf, n, max_steps)
+                for trf in frontier]
+        for future in futures:
+            results.merge(future.result())
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+            description="Enumerate n-state, 2-symbol busy beaver candidates.")
+    parser.add_argument("states", type=int, help="Number of states, n")
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS,
+            help="Step budget per machine (default {})".format(MAX_STEPS))
+    parser.add_argument("--workers", type=int, default=None,
+            help="Worker processes (default: CPU count)")
+    parser.add_argument("--split-depth", type=int, default=3,
+            help="Tree depth at which subtrees go to workers (default 3)")
+    parser.add_argument("-o", "--output", default=None,
+            help="Write the undecided machines to this file")
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    results = enumerate_machines(args.states, args.max_steps, args.workers,
+            args.split_depth)
+    seconds = time.perf_counter() - start_time
+
+    print("States: {}, machines: {}, halting: {}, looping: {}, undecided: {}"
+            .format(args.states, results.machines, results.halting,
+            results.looping, len(results.undecided)))
+    print("Score leader(s), {} ones: {}".format(results.score,
+            ", ".join(results.score_leaders)))
+    print("Steps leader(s), {} steps: {}".format(results.steps,
+            ", ".join(results.step_leaders)))
+    print("{:.2f} s, {:.0f} machines/s".format(seconds,
+            results.machines / seconds if seconds else 0))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            for name in results.undecided:
+                f.write(name + "\n")
+        print("Undecided machines written to {}".format(args.output))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
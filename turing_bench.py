@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+#
+# turing_bench.py
+# Requires: turing_engine.py, turing_registry.py, turing_run.py
+#
+# Benchmark the engine on the built-in programs, over a ladder of operand
+# sizes, in each of its run modes. Results can be saved as a baseline, and
+# later runs compared with it, so that a change to the hot path that makes
+# it slower is seen.
+#
+"""
+Usage:
+
+    python3 turing_bench.py                              # Print results
+    python3 turing_bench.py --save                       # Save the baseline
+    python3 turing_bench.py --compare --threshold 0.1    # Check against it
+    python3 turing_bench.py --programs addition --modes run plain
+    python3 turing_bench.py --file program.tm --data 11_10 --data 1111_1
+
+Engine modes:
+
+    run     TuringEngine.run(), with sweeps accelerated
+    plain   TuringEngine.run(accelerate=False)
+    cached  TuringEngine.run() with a new WindowCache for each run
+    step    TuringEngine.run_until(), the path taken when observed
+
+Each mode is run in a new process, so that its peak RSS is its own. A case
+is run until at least MIN_SECONDS have passed. That is repeated in new
+processes, and the median time kept. The spread, the interquartile range
+of the repeats over the median, is kept too. Allocations are the peak
+traced by tracemalloc, in a separate run, as tracing slows the engine.
+
+With --compare the exit status is 1 if any case takes more than threshold
+longer per step than in the baseline, plus the larger spread of the two, so
+that noise is not a regression.
+"""
+import sys
+import json
+import time
+import platform
+import statistics
+import argparse
+import tracemalloc
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from turing_engine import TuringEngine, WindowCache
+from turing_registry import get_program, program_name, arity
+from turing_run import peak_memory_kb
+
+BASELINE = "turing_bench_baseline.json"
+THRESHOLD = 0.10
+MAX_STEPS = 10**6
+# inc counts up for ever. Its runs are capped.
+INC_STEPS = 10**5
+MIN_SECONDS = 0.2
+REPEAT = 5
+
+MODES = ("run", "plain", "cached", "step")
+
+# Programs and operand sizes in bits. Programs without operands have one
+# size, 0.
+SUITE = {
+    "addition": (4, 6, 8, 10),
+    "dec": (4, 8, 12, 16),
+    "inc": (4, 8, 12, 16),
+    "busy_beaver_3": (0,),
+    "busy_beaver_4": (0,),
+}
+STEP_LIMIT = {"inc": INC_STEPS}
+
+
+def operand_data(name, bits):
+    """
+    The initial tape for a program with operands of a number of bits. Each
+    operand is all ones. E.g. 1111_1111
+    """
+    operands = arity(name)
+    if operands == 0:
+        return "_"
+    return "_".join(["1" * bits] * operands)
+
+
+def suite_cases(programs=None):
+    """
+    Return the cases of the suite as (program, label, data, max steps).
+    """
+    cases = []
+    for name, sizes in SUITE.items():
+        if programs and name not in programs:
+            continue
+        for bits in sizes:
+            cases.append((name, str(bits), operand_data(name, bits),
+                    STEP_LIMIT.get(name, MAX_STEPS)))
+    return cases
+
+
+def run_mode(engine, mode, max_steps):
+    """
+    Run the loaded engine in a mode. Returns the steps executed.
+    """
+    if mode == "run":
+        return engine.run(max_steps)
+    if mode == "plain":
+        return engine.run(max_steps, accelerate=False)
+    if mode == "cached":
+        return engine.run(max_steps, cache=WindowCache())
+    return engine.run_until(None, max_steps)
+
+
+def time_case(program, data, mode, max_steps):
+    """
+    Return (steps, seconds per run) of a case, run until at least
+    MIN_SECONDS have passed.
+    """
+    engine = TuringEngine(program)
+    runs = 0
+    seconds = 0.0
+    while seconds < MIN_SECONDS:
+        engine.load(program, data)
+        start = time.perf_counter()
+        steps = run_mode(engine, mode, max_steps)
+        seconds += time.perf_counter() - start
+        runs += 1
+    return steps, seconds / runs
+
+
+def traced_peak(program, data, mode, max_steps):
+    """
+    Peak memory allocated during a run of a case, in bytes.
+    """
+    engine = TuringEngine(program)
+    engine.load(program, data)
+    tracemalloc.start()
+    try:
+        run_mode(engine, mode, max_steps)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_mode(mode, cases, traced=True):
+    """
+    Worker process entry point. Time every case once in one mode.
+    Returns a dictionary of result records, by key.
+    """
+    results = {}
+    for name, label, data, max_steps in cases:
+        program = get_program(name)
+        steps, seconds = time_case(program, data, mode, max_steps)
+        results["{}:{}:{}".format(name, label, mode)] = {
+            "program": name, "size": label, "mode": mode, "steps": steps,
+            "seconds": seconds,
+            "alloc_kb": traced_peak(program, data, mode, max_steps) / 1024
+                    if traced else None,
+        }
+    rss = peak_memory_kb()
+    for record in results.values():
+        record["peak_rss_kb"] = rss
+    return results
+
+
+def benchmark(cases, modes=MODES, repeat=REPEAT):
+    """
+    Run the cases in each mode, each mode in a new process, repeat times.
+    The repeats are in rounds over the modes, so that the spread includes
+    the difference between processes, and the time kept is the median.
+    Returns a dictionary of result records, by key.
+    """
+    results = {}
+    times = {}
+    context = multiprocessing.get_context("spawn")
+    for i in range(repeat):
+        for mode in modes:
+            # Allocations are traced in the first round only.
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                records = executor.submit(bench_mode, mode, cases,
+                        i == 0).result()
+            for key, record in records.items():
+                results.setdefault(key, record)
+                times.setdefault(key, []).append(record["seconds"])
+
+    for key, record in results.items():
+        seconds = statistics.median(times[key])
+        quartiles = statistics.quantiles(times[key], n=4)
+        steps = record["steps"]
+        record.update({"seconds": seconds,
+                "spread": (quartiles[2] - quartiles[0]) / seconds,
+                "ns_per_step": seconds * 1e9 / steps if steps else None,
+                "steps_per_second": steps / seconds if seconds else None})
+    return results
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Return {key: (change, limit)} of the ns per step of each result against
+    the baseline. E.g. a change of 0.25 is 25% slower. A change over limit,
+    threshold plus the larger spread of the two timings, is a regression.
+    Cases not in the baseline are left out.
+    """
+    changes = {}
+    for key, record in results.items():
+        old = baseline.get(key)
+        if old and old.get("ns_per_step") and record["ns_per_step"]:
+            spread = max(record["spread"], old.get("spread", 0))
+            changes[key] = (record["ns_per_step"] / old["ns_per_step"] - 1,
+                    threshold + spread)
+    return changes
+
+
+def format_number(value, digits=0):
+    if value is None:
+        return "-"
+    return "{:,.{}f}".format(value, digits)
+
+
+def print_results(results, changes=None):
+    """
+    Print the results as a table, with the changes from the baseline.
+    """
+    print("{:<16} {:>6} {:<7} {:>10} {:>9} {:>7} {:>12} {:>9} {:>9} {:>8}"
+            .format("Program", "Size", "Mode", "Steps", "ns/step", "Spread",
+            "Steps/s", "Alloc kB", "RSS kB", "Change"))
+    for key, r in results.items():
+        change = ""
+        if changes and key in changes:
+            change = "{:+.1%}".format(changes[key][0])
+            if changes[key][0] > changes[key][1]:
+                change += " !"
+        print("{:<16} {:>6} {:<7} {:>10} {:>9} {:>7} {:>12} {:>9} {:>9} {:>8}"
+                .format(r["program"][-16:], r["size"][:6], r["mode"],
+                format_number(r["steps"]), format_number(r["ns_per_step"]),
+                "{:.0%}".format(r["spread"]),
+                format_number(r["steps_per_second"]),
+                format_number(r["alloc_kb"], 1),
+                format_number(r["peak_rss_kb"]), change))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+            description="Benchmark the Turing engine.")
+    parser.add_argument("--programs", nargs="+", default=None,
+            help="Suite programs to run (default all: {})"
+            .format(", ".join(SUITE)))
+    parser.add_argument("--file", action="append", default=[],
+            help="A program file, or any registry program, to run as well")
+    parser.add_argument("--data", action="append", default=[],
+            help="Initial tape for --file programs. May be repeated")
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS,
+            help="Step cap of --file runs (default {})".format(MAX_STEPS))
+    parser.add_argument("--modes", nargs="+", default=list(MODES),
+            choices=MODES, help="Engine modes (default all)")
+    parser.add_argument("--repeat", type=int, default=REPEAT,
+            help="Timings per case, the median is kept (default {})"
+            .format(REPEAT))
+    parser.add_argument("--baseline", default=BASELINE,
+            help="Baseline file (default {})".format(BASELINE))
+    parser.add_argument("--save", action="store_true",
+            help="Save the results as the baseline")
+    parser.add_argument("--compare", action="store_true",
+            help="Compare with the baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+            help="Slow down, per step, that is a regression (default {})"
+            .format(THRESHOLD))
+    parser.add_argument("-o", "--output", default=None,
+            help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    programs = [program_name(name) for name in args.programs or []]
+    cases = suite_cases(programs) if not args.file or args.programs else []
+    for path in args.file:
+        name = program_name(path)
+        for data in args.data or ["_"]:
+            cases.append((name, data, data, args.max_steps))
+
+    results = benchmark(cases, args.modes, args.repeat)
+    report = {"python": platform.python_version(),
+            "platform": platform.platform(), "results": results}
+
+    changes = None
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        changes = compare(results, baseline["results"], args.threshold)
+        if baseline.get("python") != report["python"]:
+            print("Note: baseline is Python {}, this is Python {}".format(
+                    baseline.get("python"), report["python"]))
+    print_results(results, changes)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=1)
+        print("Baseline written to {}".format(args.baseline))
+
+    if changes:
+        regressions = [key for key, (change, limit) in changes.items()
+                if change > limit]
+        if regressions:
+            print("{} regression(s) over {:.0%} plus spread: {}".format(
+                    len(regressions), args.threshold, ", ".join(regressions)))
+            return 1
+        print("No regressions over {:.0%} plus spread".format(args.threshold))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1325 @@
+#!/usr/bin/env python3
+#
+# turing_engine.py
+#
+# A headless Turing machine engine. It holds the state, tape and head
+# position and executes the transition function (trf) dictionaries that are
+# produced by turing_program.py.
+#
+# This library does not import tkinter. The GUI in turing_machine.py
+# subscribes to the engine as an observer, so batch jobs may import this
+# module on its own.
+#
+"""
+Usage:
+
+    import turing_program
+    from turing_engine import TuringEngine
+
+    engine = TuringEngine(turing_program.function_addition(), "11_10")
+    engine.run()
+    print(engine.state, engine.counter, engine.tape_string())
+
+Observers are callables that receive the engine after every step. The
+details of the last step are available as engine.last, a tuple of:
+
+    (counter, head position, state, read, next state, write, direction)
+
+Before it is run a trf dictionary is compiled by compile_program() into
+flat tables indexed by state_index * N_SYMBOLS + symbol_index. Symbols are
+held as small integers, the index into SYMBOLS, so the underscore / blank
+is 0. Each table entry holds the next state index, the symbol to write and
+the head delta (+1 right, -1 left, 0 no move).
+
+A Profile counts the steps taken by each transition, in each state and at
+each head position:
+
+    profile = Profile(engine)
+    profile.attach()
+    engine.run()
+    print(profile.report())
+
+validate_program() checks that every transition that can be met is
+defined, and finds states that are unreachable or can never halt.
+"""
+import re
+import sys
+from array import array
+from collections import OrderedDict, Counter
+
+# Initial number of cells allocated for a tape. It grows as required.
+TAPE_LENGTH = 64
+MAX_ITERATION = 9999
+
+# Cells in the first window of a backward sweep search. See sweep_distance()
+SWEEP_WINDOW = 64
+# A sweep shorter than SWEEP_SHORT cells is slower than stepping. When a
+# sweep's shortfall, less its recent gains, is over SWEEP_PATIENCE cells it
+# is turned off for the rest of the run.
+SWEEP_SHORT = 6
+SWEEP_PATIENCE = 8
+
+BLANK = "_"
+HALT = "h"
+COMMENT = "c"
+
+# Symbols in the order of their integer codes. Blank must be code 0.
+SYMBOLS = (BLANK, "0", "1")
+SYMBOL_CODE = {s: i for i, s in enumerate(SYMBOLS)}
+N_SYMBOLS = len(SYMBOLS)
+
+ONE = SYMBOL_CODE["1"]
+
+# Translate a string of symbols to codes and back again.
+ENCODE = bytes.maketrans("".join(SYMBOLS).encode(), bytes(range(N_SYMBOLS)))
+DECODE = bytes.maketrans(bytes(range(N_SYMBOLS)), "".join(SYMBOLS).encode())
+
+# Verdicts of TuringEngine.decide()
+HALTS = "halts"
+LOOPS = "loops"
+UNDEFINED = "undefined"
+BUDGET = "budget"
+# Status of a run in the JSON output of turing_run.py, turing_batch.py and
+# turing_vector.py.
+STATUS_NAME = {HALTS: "halts", LOOPS: "loops", BUDGET: "timeout",
+        UNDEFINED: "undefined"}
+
+# Tape fingerprints are sum(code * BASE ** position) modulo PRIME.
+PRIME = (1 << 61) - 1
+BASE = 1000003
+
+# Expand r, l, n to a head delta.
+MOVES = {"r": 1, "l": -1, "n": 0}
+MOVE_NAME = {1: "r", -1: "l", 0: "n"}
+
+
+class CompiledProgram:
+    """
+    Turing code compiled from a trf dictionary into integer tables.
+
+    states      - state names. states[halt] is "h"
+    state_index - state name to index
+    next_state  - array, next state index or -1 if there is no transition
+    write       - array, symbol code to write
+    delta       - array, head delta
+    actions     - list of (next state, write, delta) tuples, or None
+    total       - actions with no None, used by the engine hot loop. An
+                  undefined transition at index k goes to the sink state
+                  halt + 1 + k, writing back the symbol read, without moving.
+    sweeps      - list of (delta, stop, stop codes, stop pattern) or None.
+                  Set where the transition loops back to its own state,
+                  rewrites the same symbol and moves. E.g. δ[0, 1] = 0, 1, r.
+                  The head keeps moving until it reads one of the stop codes.
+                  stop is the stop code if there is only one, otherwise -1.
+                  The pattern is a regular expression of a stop code byte.
+    sweep_total - total, except that a sweep at index k goes to the marker
+                  state halt + 1 + len(total) + k, like an undefined
+                  transition, so that the hot loop only looks up one table.
+    comments    - state name to comment. Only used by the display.
+    """
+    def __init__(self, trf):
+        self.trf = trf
+
+        # States in the order they are defined, then any that are only
+        # referenced as a next state. Halt is always last.
+        states = []
+        for k in trf:
+            name = str(k[0]).lower()
+            if name != HALT and name not in states:
+                states.append(name)
+        for k, v in trf.items():
+            if str(k[1]).lower() == COMMENT:
+                continue
+            name = str(v[0]).lower()
+            if name != HALT and name not in states:
+                states.append(name)
+        states.append(HALT)
+
+        self.states = states
+        self.state_index = {name: i for i, name in enumerate(states)}
+        self.halt = len(states) - 1
+        self.comments = {}
+
+        size = len(states) * N_SYMBOLS
+        self.next_state = array("i", [-1]) * size
+        self.write = array("b", [0]) * size
+        self.delta = array("b", [0]) * size
+
+        for k, v in trf.items():
+            state, symbol = str(k[0]).lower(), str(k[1]).lower()
+            if symbol == COMMENT:
+                self.comments[state] = v
+                continue
+            if state == HALT:
+                continue
+            q, Y, D = (str(item).lower() for item in v)
+            if symbol not in SYMBOL_CODE or Y not in SYMBOL_CODE:
+                raise ValueError("Illegal symbol in δ[{}, {}] = {}"
+                        .format(state, symbol, v))
+            if D not in MOVES:
+                raise ValueError("Illegal move in δ[{}, {}] = {}"
+                        .format(state, symbol, v))
+            i = self.state_index[state] * N_SYMBOLS + SYMBOL_CODE[symbol]
+            self.next_state[i] = self.state_index[q]
+            self.write[i] = SYMBOL_CODE[Y]
+            self.delta[i] = MOVES[D]
+
+        # Halt is a fixed point. Keep the symbol, don't move.
+        for symbol in range(N_SYMBOLS):
+            i = self.halt * N_SYMBOLS + symbol
+            self.next_state[i] = self.halt
+            self.write[i] = symbol
+
+        self.actions = [
+                (q, Y, D) if q >= 0 else None
+                for q, Y, D in zip(self.next_state, self.write, self.delta)]
+        self.total = [
+                action if action is not None
+                else (self.halt + 1 + k, k % N_SYMBOLS, 0)
+                for k, action in enumerate(self.actions)]
+
+        # Self-looping "move over data" transitions.
+        self.sweeps = [None] * size
+        for state in range(self.halt):
+            row = state * N_SYMBOLS
+            for D in (1, -1):
+                loop = [symbol for symbol in range(N_SYMBOLS)
+                        if self.actions[row + symbol] == (state, symbol, D)]
+                stops = tuple(symbol for symbol in range(N_SYMBOLS)
+                        if symbol not in loop)
+                pattern = re.compile(b"[" + re.escape(bytes(stops)) + b"]")
+                stop = stops[0] if len(stops) == 1 else -1
+                for symbol in loop:
+                    self.sweeps[row + symbol] = (D, stop, stops, pattern)
+        self.sweep_total = [
+                action if sweep is None
+                else (self.halt + 1 + size + k, k % N_SYMBOLS, 0)
+                for k, (action, sweep) in enumerate(zip(self.total, self.sweeps))]
+
+
+    def __len__(self):
+        return len(self.states)
+
+
+    def transition(self, state, symbol):
+        """
+        Return δ[state, symbol] as (next state, write, move) names, or None
+        if there is no transition. E.g. ("0", "1", "r")
+        """
+        i = self.state_index[state] * N_SYMBOLS + SYMBOL_CODE[symbol]
+        q = self.next_state[i]
+        if q < 0:
+            return None
+        return self.states[q], SYMBOLS[self.write[i]], MOVE_NAME[self.delta[i]]
+
+
+class Tape:
+    """
+    An unbounded tape. One byte per cell holds the symbol code, in a
+    bytearray, self.cells. The cell at a tape position is
+    self.cells[self.origin + position]. Reads outside of the cells are blank.
+    Writes outside grow the bytearray geometrically in that direction.
+
+    Every change of a cell is passed to account(), which keeps up to date:
+    ones      - count of cells holding a one
+    nonblank  - count of cells not holding an underscore
+    left      - position of the leftmost non-blank cell
+    right     - position of the rightmost non-blank cell
+    field_end - position of the first underscore after left. The first
+                field, the block of data on the tape, is left to field_end.
+    Each write is constant time, except for a write that joins the first
+    field to the block after it, which searches for the end of that block.
+    Blanking the whole first field, or an edge cell next to an underscore,
+    leaves the next block unknown. Then the edges are stale, only bounds,
+    and extent() searches for them on request. The text of the first field
+    is cached by first_field() until a write at or before its end.
+    """
+    def __init__(self, initial_data=""):
+        self.reset(initial_data)
+
+
+    def reset(self, initial_data=""):
+        """
+        Blank the tape then write initial data starting at position 0.
+        Allocation is proportional to len(initial_data), not the old tape.
+        """
+        data = initial_data.encode().translate(ENCODE)
+        size = max(TAPE_LENGTH, 2 * len(data))
+        self.origin = size // 4
+        self.cells = bytearray(size)
+        self.cells[self.origin:self.origin + len(data)] = data
+
+        self.ones = data.count(ONE)
+        self.nonblank = len(data) - data.count(0)
+        self.left = len(data) - len(data.lstrip(b"\0"))
+        self.right = len(data.rstrip(b"\0")) - 1
+        end = data.find(0, self.left)
+        self.field_end = len(data) if end < 0 else end
+        self.stale = False
+        self.field = None
+
+
+    def account(self, position, old, code):
+        """
+        Book keeping after the cell at position changed from old to code.
+        """
+        if old == ONE:
+            self.ones -= 1
+        if code == ONE:
+            self.ones += 1
+        if position <= self.field_end:
+            self.field = None
+
+        if old == 0:
+            # Blank to data. May extend the edges or the first field.
+            self.nonblank += 1
+            if self.nonblank == 1:
+                self.left = self.right = position
+                self.field_end = position + 1
+                self.stale = False
+                self.field = None
+                return
+            if position > self.right:
+                self.right = position
+            if position < self.left:
+                if position < self.left - 1 and not self.stale:
+                    # A new first field, of one cell.
+                    self.field_end = position + 1
+                self.left = position
+            elif position == self.field_end and not self.stale:
+                # Joined to the block after it.
+                end = self.cells.find(0, position + self.origin + 1)
+                if end < 0:
+                    end = len(self.cells)
+                self.field_end = end - self.origin
+        elif code == 0:
+            # Data to blank. The first field, or an edge, may move in.
+            self.nonblank -= 1
+            if self.nonblank == 0 or self.stale:
+                return
+            if position == self.left:
+                if position + 1 < self.field_end:
+                    self.left = position + 1
+                else:
+                    self.stale = True
+            elif position < self.field_end:
+                self.field_end = position
+            if position == self.right:
+                if self.cells[position + self.origin - 1]:
+                    self.right = position - 1
+                else:
+                    self.stale = True
+
+
+    def __getitem__(self, position):
+        i = position + self.origin
+        if 0 <= i < len(self.cells):
+            return self.cells[i]
+        return 0
+
+
+    def __setitem__(self, position, code):
+        i = position + self.origin
+        if not 0 <= i < len(self.cells):
+            if code == 0:
+                return
+            self.grow(position)
+            i = position + self.origin
+        old = self.cells[i]
+        if old != code:
+            self.cells[i] = code
+            self.account(position, old, code)
+
+
+    def grow(self, position):
+        """
+        Grow the cells so that position is on the tape. At least doubles the
+        size. A new bytearray is created, so memoryviews of the old cells
+        remain valid (but stale).
+        """
+        i = position + self.origin
+        size = len(self.cells)
+        if i < 0:
+            extra = max(size, -i)
+            self.cells = bytearray(extra) + self.cells
+            self.origin += extra
+        elif i >= size:
+            extra = max(size, i - size + 1)
+            self.cells = self.cells + bytearray(extra)
+
+
+    def copy(self):
+        """
+        Return an independent copy of the tape.
+        """
+        tape = Tape.__new__(Tape)
+        tape.__dict__.update(self.__dict__)
+        tape.cells = bytearray(self.cells)
+        return tape
+
+
+    def window(self, first, last):
+        """
+        Return a memoryview of the symbol codes from position first to last
+        inclusive. No copy is made.
+        """
+        self.grow(first)
+        self.grow(last)
+        i = first + self.origin
+        return memoryview(self.cells)[i:i + last - first + 1]
+
+
+    def read(self, first, last):
+        """
+        Return bytes of the symbol codes from position first to last
+        inclusive, blank beyond the cells. The tape is not grown.
+        """
+        i = first + self.origin
+        j = last + self.origin + 1
+        if 0 <= i and j <= len(self.cells):
+            return bytes(self.cells[i:j])
+        # Over an end of the cells.
+        return bytes(self[position] for position in range(first, last + 1))
+
+
+    def extent(self):
+        """
+        Return (left, right), the positions of the leftmost and rightmost
+        non-blank cells, or None if the tape is blank.
+        """
+        if self.nonblank == 0:
+            return None
+        if self.stale:
+            # Search inwards from the old edges.
+            cells = self.cells
+            start = max(self.left + self.origin, 0)
+            end = min(self.right + self.origin + 1, len(cells))
+            found = [cells.find(code, start, end) for code in range(1, N_SYMBOLS)]
+            self.left = min(i for i in found if i >= 0) - self.origin
+            found = [cells.rfind(code, start, end) for code in range(1, N_SYMBOLS)]
+            self.right = max(found) - self.origin
+            end = cells.find(0, self.left + self.origin)
+            self.field_end = (len(cells) if end < 0 else end) - self.origin
+            self.stale = False
+        return self.left, self.right
+
+
+    def contents(self):
+        """
+        Return (left, cells), the position of the leftmost non-blank cell and
+        a bytes copy of the codes up to the rightmost. Two tapes hold the
+        same data if their contents are equal.
+        """
+        extent = self.extent()
+        if extent is None:
+            return None
+        start = extent[0] + self.origin
+        return extent[0], bytes(self.cells[start:extent[1] + self.origin + 1])
+
+
+    def restore(self, left, cells):
+        """
+        Blank the tape then write cells, symbol codes, from position left.
+        The inverse of contents().
+        """
+        self.reset(bytes(cells).translate(DECODE).decode())
+        self.origin -= left
+        self.left += left
+        self.right += left
+        self.field_end += left
+
+
+    def fingerprint(self):
+        """
+        Return the fingerprint of the tape contents. See step_fingerprint().
+        """
+        total = 0
+        origin = self.origin
+        for i, code in enumerate(self.cells):
+            if code:
+                total += code * pow(BASE, i - origin, PRIME)
+        return total % PRIME
+
+
+    def first_field(self):
+        """
+        Return the first block of data on the tape as a string, i.e. from the
+        leftmost non-blank cell up to the first underscore. E.g. "101"
+        """
+        if self.field is None:
+            extent = self.extent()
+            if extent is None:
+                self.field = ""
+            else:
+                origin = self.origin
+                self.field = (self.cells[extent[0] + origin:self.field_end + origin]
+                        .translate(DECODE).decode())
+        return self.field
+
+
+    def __str__(self):
+        """
+        The tape contents, ignoring leading and trailing underscores.
+        """
+        extent = self.extent()
+        if extent is None:
+            return ""
+        start = extent[0] + self.origin
+        end = extent[1] + self.origin + 1
+        return self.cells[start:end].translate(DECODE).decode()
+
+
+def sweep_distance(cells, i, delta, stops, pattern):
+    """
+    Return the number of cells the head moves, from index i into cells in
+    direction delta, before it reads one of the stop codes. pattern matches
+    a stop code. Cells outside are blank. Returns None if the head never
+    stops.
+    """
+    if delta > 0:
+        start = max(i, 0)
+        if len(stops) == 1:
+            j = cells.find(stops[0], start)
+        else:
+            match = pattern.search(cells, start)
+            j = match.start() if match else -1
+        if j >= 0:
+            return j - i
+        if 0 in stops:
+            return len(cells) - i
+    else:
+        end = min(i + 1, len(cells))
+        if len(stops) == 1:
+            j = cells.rfind(stops[0], 0, end)
+        else:
+            # There is no reverse search of a pattern. Search back in
+            # windows growing by four times, so no cell is read more than
+            # a few times.
+            j = -1
+            width = SWEEP_WINDOW
+            while end > 0:
+                first = max(end - width, 0)
+                j = max(cells.rfind(stops[0], first, end),
+                        cells.rfind(stops[1], first, end))
+                if j >= 0:
+                    break
+                end = first
+                width *= 4
+        if j >= 0:
+            return i - j
+        if 0 in stops:
+            return i + 1
+    return None
+
+
+class WindowCache:
+    """
+    A bounded memo of repeated local computations. The tape is divided into
+    windows of width cells. The key is the state, the head offset in the
+    window and the window contents. The outcome is the result of running
+    until the head leaves the window or the machine halts:
+
+        (state, offset, window) -> (window, state, offset, steps)
+
+    The least recently used outcome is evicted when maxsize is reached.
+    The outcomes are only true of one program. A cache is bound to the first
+    program it is used with, and raises ValueError if used with another.
+    """
+    def __init__(self, width=8, maxsize=4096):
+        self.width = width
+        self.maxsize = maxsize
+        self.program = None
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def bind(self, program):
+        """
+        Bind the cache to a CompiledProgram, unless it is already bound to
+        one with the same transitions.
+        """
+        if self.program is None:
+            self.program = program
+        elif (program is not self.program
+                and program.actions != self.program.actions):
+            raise ValueError("WindowCache holds outcomes of another program. "
+                    "Use a new WindowCache for each program.")
+
+
+    def get(self, key):
+        outcome = self.entries.get(key)
+        if outcome is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return outcome
+
+
+    def put(self, key, outcome):
+        self.entries[key] = outcome
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+
+    def stats(self):
+        """
+        Return a dictionary of the hit, miss and eviction counters.
+        """
+        return {"hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "size": len(self.entries)}
+
+
+def run_window(program, cells, i, state, max_steps):
+    """
+    Step the program on a bytearray of cells, from index i, until the head
+    leaves the cells, the machine halts, there is no transition or max_steps
+    are executed. cells is updated. Returns (state, i, steps).
+    """
+    actions = program.actions
+    halt = program.halt
+    size = len(cells)
+    steps = 0
+    while 0 <= i < size and state != halt and steps < max_steps:
+        action = actions[state * N_SYMBOLS + cells[i]]
+        if action is None:
+            break
+        state, cells[i], D = action
+        i += D
+        steps += 1
+    return state, i, steps
+
+
+class Verdict:
+    """
+    The outcome of TuringEngine.decide().
+
+    kind      - HALTS, LOOPS, UNDEFINED or BUDGET
+    steps     - value of the counter when the verdict was reached
+    period    - for LOOPS, steps in one cycle
+    preperiod - for LOOPS, value of the counter when the cycle starts. For a
+                translated cycle this is when the repeat was first seen,
+                which may be later than the true start.
+    shift     - for LOOPS, head movement in one cycle. 0 if the whole
+                configuration repeats, otherwise a translated cycle.
+    """
+    def __init__(self, kind, steps, period=None, preperiod=None, shift=0):
+        self.kind = kind
+        self.steps = steps
+        self.period = period
+        self.preperiod = preperiod
+        self.shift = shift
+
+
+    def __str__(self):
+        if self.kind == LOOPS:
+            s = "loops (period {}, pre-period {}".format(self.period,
+                    self.preperiod)
+            if self.shift:
+                s += ", shift {}".format(self.shift)
+            return s + ")"
+        if self.kind == BUDGET:
+            return "budget exhausted after {} steps".format(self.steps)
+        if self.kind == UNDEFINED:
+            return "undefined transition after {} steps".format(self.steps)
+        return "halts after {} steps".format(self.steps)
+
+
+class EdgeRecords:
+    """
+    Brent's cycle detection over the steps at which the head moves past
+    every cell visited so far, at one edge of the tape, direction +1 for
+    the right edge or -1 for the left.
+
+    Beyond the record the tape is blank. If a later record is in the same
+    state as a saved record, and the cells behind the head agree as far back
+    as the head has been since the saved record, the machine repeats the
+    same moves, shifted along the tape, for ever.
+    """
+    def __init__(self, direction):
+        self.direction = direction
+        self.saved = None
+        self.power = self.lam = 1
+        self.reach = 0
+
+
+    def track(self, head):
+        """
+        Note how far back the head has gone since the saved record.
+        """
+        if self.saved is not None:
+            back = (self.saved[1] - head) * self.direction
+            if back > self.reach:
+                self.reach = back
+
+
+    def behind(self, tape, head, n):
+        """
+        The n cells from the head backwards, nearest first.
+        """
+        if self.direction > 0:
+            return bytes(tape.window(head - n + 1, head))[::-1]
+        return bytes(tape.window(head, head + n - 1))
+
+
+    def record(self, engine, far):
+        """
+        Called when the head has broken the record. far is the position of
+        the opposite edge. Returns a Verdict if a translated cycle is found.
+        """
+        head = engine.head
+        verdict = None
+        if self.saved is not None and self.saved[0] == engine.state_index:
+            state, saved_head, counter, cells = self.saved
+            n = self.reach + 1
+            # Cells beyond the saved ones were blank.
+            old = cells[:n] + bytes(max(0, n - len(cells)))
+            if self.behind(engine.tape, head, n) == old:
+                verdict = Verdict(LOOPS, engine.counter,
+                        engine.counter - counter, counter, head - saved_head)
+        if self.lam == self.power:
+            n = (head - far) * self.direction + 1
+            self.saved = (engine.state_index, head, engine.counter,
+                    self.behind(engine.tape, head, n))
+            self.power *= 2
+            self.lam = 0
+            self.reach = 0
+        self.lam += 1
+        return verdict
+
+
+def step_fingerprint(engine, fingerprint):
+    """
+    Execute a single step and return the new fingerprint of the tape, or
+    None if the engine did not step. Only the cell written changes the sum.
+    """
+    tape = engine.tape
+    position = engine.head
+    X = tape[position]
+    if not engine.step():
+        return None
+    Y = tape[position]
+    if Y != X:
+        fingerprint = (fingerprint + (Y - X) * pow(BASE, position, PRIME)) % PRIME
+    return fingerprint
+
+
+class LoopDetector:
+    """
+    Step an engine while checking for a configuration that repeats.
+
+    Cycles are found by Brent's algorithm: the configuration is saved
+    at a power of two steps and compared with every later step until
+    the next power of two. Comparing the state, head position and an
+    incrementally kept tape fingerprint is constant time, and a match
+    is confirmed by comparing the tape contents. The pre-period is then
+    found by re-running from the start.
+
+    Translated cycles, which move along the tape for ever, are found in
+    the same way at the steps that break the record at either edge. See
+    EdgeRecords.
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        tape = engine.tape
+        self.start = (engine.state_index, engine.head, engine.counter,
+                tape.copy())
+        self.fingerprint = tape.fingerprint()
+        self.saved = (engine.state_index, engine.head, self.fingerprint,
+                engine.counter)
+        self.saved_contents = tape.contents()
+        self.power = self.lam = 1
+
+        # Visited cells. Beyond them the tape has always been blank.
+        extent = tape.extent() or (engine.head, engine.head)
+        self.low = min(extent[0], engine.head)
+        self.high = max(extent[1], engine.head)
+        self.right = EdgeRecords(1)
+        self.left = EdgeRecords(-1)
+
+
+    def step(self):
+        """
+        Execute a single step. Returns a Verdict if the machine has stopped
+        or provably loops, otherwise None.
+        """
+        engine = self.engine
+        fingerprint = step_fingerprint(engine, self.fingerprint)
+        if fingerprint is None:
+            return engine.verdict()
+        self.fingerprint = fingerprint
+        state = engine.state_index
+        head = engine.head
+
+        saved = self.saved
+        if (state == saved[0] and head == saved[1]
+                and fingerprint == saved[2]
+                and engine.tape.contents() == self.saved_contents):
+            period = engine.counter - saved[3]
+            return Verdict(LOOPS, engine.counter, period,
+                    engine.cycle_start(self.start, period))
+        if self.lam == self.power:
+            self.saved = (state, head, fingerprint, engine.counter)
+            self.saved_contents = engine.tape.contents()
+            self.power *= 2
+            self.lam = 0
+        self.lam += 1
+
+        self.right.track(head)
+        self.left.track(head)
+        if head > self.high:
+            self.high = head
+            return self.right.record(engine, self.low)
+        if head < self.low:
+            self.low = head
+            return self.left.record(engine, self.high)
+        return None
+
+
+class Profile:
+    """
+    Count the steps of an engine, while subscribed to it, by transition, by
+    state and by head position.
+
+    transitions - Counter of (state, read) to steps
+    heads       - Counter of head position to steps read there
+    steps       - total steps counted
+
+    An observed engine takes the slower path of run_until(), so only attach
+    a Profile when the counts are wanted.
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.reset()
+
+
+    def attach(self):
+        """
+        Subscribe to the engine's steps.
+        """
+        self.engine.subscribe(self.record)
+
+
+    def detach(self):
+        self.engine.unsubscribe(self.record)
+
+
+    def reset(self):
+        self.transitions = Counter()
+        self.heads = Counter()
+        self.steps = 0
+
+
+    def record(self, engine):
+        """
+        Engine observer. Count the step in engine.last.
+        """
+        counter, head, p, X = engine.last[:4]
+        self.transitions[p, X] += 1
+        self.heads[head] += 1
+        self.steps += 1
+
+
+    def states(self):
+        """
+        Return a Counter of state to steps spent in it.
+        """
+        states = Counter()
+        for (p, X), count in self.transitions.items():
+            states[p] += count
+        return states
+
+
+    def report(self, top=10):
+        """
+        Return the top transitions and states, by steps, as text. E.g.
+
+            Steps: 32
+            (0, 1)   12  37.5%  0, 1, r
+            ...
+        """
+        total = self.steps or 1
+        program = self.engine.program
+        lines = ["Steps: {}".format(self.steps), "Transitions:"]
+        for (p, X), count in self.transitions.most_common(top):
+            lines.append("  ({}, {}) {:>10} {:6.1%}  {}".format(p, X, count,
+                    count / total, ", ".join(program.transition(p, X))))
+        lines.append("States:")
+        for p, count in self.states().most_common(top):
+            lines.append("  {:<6} {:>10} {:6.1%}  {}".format(p, count,
+                    count / total, program.comments.get(p, "")))
+        return "\n".join(lines)
+
+
+class Validation:
+    """
+    The outcome of validate_program(). Illegal symbols and moves are not
+    here, as compile_program() raises ValueError for them.
+
+    undefined   - (state, symbol) pairs, in reachable states, for symbols
+                  that can be read, with no transition
+    empty       - reachable states with no transitions at all. E.g. a next
+                  state that was never defined
+    unreachable - states that can't be reached from the start state
+    no_halt     - reachable states from which halt can't be reached
+    """
+    def __init__(self, undefined, empty, unreachable, no_halt):
+        self.undefined = undefined
+        self.empty = empty
+        self.unreachable = unreachable
+        self.no_halt = no_halt
+
+
+    @property
+    def total(self):
+        """
+        True if every transition that can be met is defined.
+        """
+        return not self.undefined
+
+
+    @property
+    def ok(self):
+        return not (self.undefined or self.empty or self.unreachable
+                or self.no_halt)
+
+
+    def __str__(self):
+        lines = []
+        if self.empty:
+            lines.append("States with no transitions: {}".format(
+                    ", ".join(self.empty)))
+        if self.undefined:
+            lines.append("Undefined transitions: {}".format(", ".join(
+                    "δ[{}, {}]".format(p, X) for p, X in self.undefined)))
+        if self.unreachable:
+            lines.append("Unreachable states: {}".format(
+                    ", ".join(self.unreachable)))
+        if self.no_halt:
+            lines.append("States that can't reach halt: {}".format(
+                    ", ".join(self.no_halt)))
+        return "\n".join(lines) or "OK"
+
+
+def validate_program(program, state=0, data=None):
+    """
+    Check a program, a trf dictionary or a CompiledProgram, run from state.
+    Returns a Validation.
+
+    Any cell may be read in any reachable state, so the symbols that can be
+    read are the blank, those written by the program and those in data, the
+    initial tape. If data is None, any symbol may be on the initial tape.
+    Raises ValueError, from compile_program(), for an illegal symbol or move.
+    """
+    program = compile_program(program)
+    halt = program.halt
+    states = program.states
+    if data is None:
+        readable = set(range(N_SYMBOLS))
+    else:
+        # An empty tape has a 0 at position 0. See TuringEngine.reset_tape()
+        readable = {0} | set((data or "0").encode().translate(ENCODE))
+        readable |= {Y for (q, Y, D)
+                in filter(None, program.actions[:halt * N_SYMBOLS])}
+    readable = sorted(readable)
+
+    # States reachable from the start, along defined transitions.
+    start = program.state_index.get(str(state).lower(), halt)
+    reached = {start}
+    todo = [start]
+    undefined = []
+    while todo:
+        p = todo.pop()
+        if p == halt:
+            continue
+        for X in readable:
+            action = program.actions[p * N_SYMBOLS + X]
+            if action is None:
+                undefined.append((p, X))
+            elif action[0] not in reached:
+                reached.add(action[0])
+                todo.append(action[0])
+
+    # States that can reach halt, going backwards from it.
+    back = {q: set() for q in range(len(states))}
+    for k, action in enumerate(program.actions):
+        if action is not None:
+            back[action[0]].add(k // N_SYMBOLS)
+    halting = {halt}
+    todo = [halt]
+    while todo:
+        for p in back[todo.pop()]:
+            if p not in halting:
+                halting.add(p)
+                todo.append(p)
+
+    live = [p for p in range(halt) if p in reached]
+    return Validation(
+            [(states[p], SYMBOLS[X]) for p, X in sorted(undefined)],
+            [states[p] for p in live if not any(program.actions[
+                    p * N_SYMBOLS:(p + 1) * N_SYMBOLS])],
+            [states[p] for p in range(halt) if p not in reached],
+            [states[p] for p in live if p not in halting])
+
+
+def compile_program(program):
+    """
+    Compile a trf dictionary, as returned by the turing_program.py functions.
+    A program that is already compiled is returned unchanged.
+    """
+    if isinstance(program, CompiledProgram):
+        return program
+    return CompiledProgram(program)
+
+
+class TuringEngine:
+    """
+    Execute Turing code, compiled from a transition function dictionary, on
+    a tape. The engine has no knowledge of any display.
+    """
+    def __init__(self, program=None, initial_data="", state=0):
+        self.observers = []
+        self.tape = Tape()
+        self.head = 0
+        self.load(program if program is not None else {}, initial_data, state)
+
+
+    def load(self, program, initial_data="", state=0):
+        """
+        Load the Turing code, a trf dictionary or a CompiledProgram, into the
+        engine and set the start state.
+        If initial_data is None the current tape is kept, otherwise the tape
+        is reset and the initial data written to it starting at position 0.
+        """
+        self.program = compile_program(program)
+        self.state_index = self.program.state_index.get(str(state).lower(),
+                self.program.halt)
+        self.counter = 0
+        self.last = None
+        self.undefined = None
+        if initial_data is not None:
+            self.reset_tape(initial_data)
+
+
+    def reset_tape(self, initial_data=""):
+        """
+        Reset the tape to underscores, with position zero set to zero, then
+        write the initial data starting at position zero. Head set to zero.
+        """
+        # Position 0 is 0, unless overwritten by the initial data.
+        self.tape.reset(initial_data or "0")
+        self.head = 0
+
+
+    def subscribe(self, observer):
+        """
+        Add an observer. It is called with the engine after every step.
+        """
+        self.observers.append(observer)
+
+
+    def unsubscribe(self, observer):
+        """
+        Remove an observer added by subscribe()
+        """
+        self.observers.remove(observer)
+
+
+    @property
+    def state(self):
+        """
+        Name of the current state. E.g. "0" or "h"
+        """
+        return self.program.states[self.state_index]
+
+
+    @property
+    def halted(self):
+        return self.state_index == self.program.halt
+
+
+    @property
+    def stopped(self):
+        """
+        True if the machine has halted or met an undefined transition.
+        """
+        return self.state_index == self.program.halt or self.undefined is not None
+
+
+    def symbol_at(self, position):
+        """
+        Return the symbol on the tape at position. E.g. "0", "1" or "_"
+        """
+        return SYMBOLS[self.tape[position]]
+
+
+    def step(self):
+        """
+        Execute a single instruction.
+        Returns False if the machine had already halted, or there is no
+        transition for the state and symbol read. In that case
+        self.undefined is set to (state, symbol) and nothing changes.
+        """
+        program = self.program
+        p = self.state_index
+        if p == program.halt:
+            return False
+
+        # Read the data at the head position.
+        X = self.tape[self.head]
+
+        # Get the action items of the state and symbol read from tape.
+        q, Y, D = program.total[p * N_SYMBOLS + X]
+        if q > program.halt:
+            self.undefined = (program.states[p], SYMBOLS[X])
+            return False
+
+        self.last = (self.counter, self.head, program.states[p], SYMBOLS[X],
+                program.states[q], SYMBOLS[Y], MOVE_NAME[D])
+
+        # Write change of 0,1 or _ to tape, move the head, set next state.
+        self.tape[self.head] = Y
+        self.head += D
+        self.state_index = q
+        self.counter += 1
+
+        for observer in self.observers:
+            observer(self)
+        return True
+
+
+    def run(self, max_steps=MAX_ITERATION, accelerate=True, cache=None):
+        """
+        Run until a halt, an undefined transition or until max_steps have
+        been executed. Returns the number of steps executed.
+
+        With accelerate, a sweep by a self-looping state over a run of cells
+        is done in one jump. The counter is exactly as if each step had
+        been executed.
+
+        With a WindowCache, repeated local computations are looked up
+        rather than executed. See run_cached().
+        """
+        if self.observers:
+            return self.run_until(None, max_steps)
+        if cache is not None:
+            return self.run_cached(max_steps, cache)
+
+        # Nobody is watching. Only small integers are touched in the loop.
+        # i is the index of the head into the tape cells.
+        program = self.program
+        if accelerate:
+            # A copy, as sweeps may be turned off during the run.
+            total = list(program.sweep_total)
+            gain = [0] * len(total)
+        else:
+            total = program.total
+        sweeps = program.sweeps
+        halt = program.halt
+        # Indexes of a transition.
+        size_k = len(total)
+        tape = self.tape
+        account = tape.account
+        cells = tape.cells
+        size = len(cells)
+        state = self.state_index
+        i = self.head + tape.origin
+        steps = 0
+        try:
+            while True:
+                # Halt, the sinks of undefined transitions and the markers
+                # of sweeps end the loop.
+                while state < halt and steps < max_steps:
+                    X = cells[i] if 0 <= i < size else 0
+                    state, Y, D = total[state * N_SYMBOLS + X]
+                    if Y != X:
+                        if not 0 <= i < size:
+                            # Off the end of the cells. Grow the tape.
+                            position = i - tape.origin
+                            tape.grow(position)
+                            cells = tape.cells
+                            size = len(cells)
+                            i = position + tape.origin
+                        cells[i] = Y
+                        account(i - tape.origin, X, Y)
+                    i += D
+                    steps += 1
+                if state <= halt:
+                    break
+
+                # Went to a sink or a marker. It was not a step.
+                steps -= 1
+                k = state - halt - 1
+                if k < size_k:
+                    # A sink. The state is the one whose transition is
+                    # undefined.
+                    state = k // N_SYMBOLS
+                    self.undefined = (program.states[state],
+                            SYMBOLS[k % N_SYMBOLS])
+                    break
+
+                # A sweep. The cell read is not changed.
+                k -= size_k
+                state = k // N_SYMBOLS
+                D, stop, stops, pattern = sweeps[k]
+                if stop == 0 and 0 <= i < size:
+                    # The usual sweep, over data to the next blank. The
+                    # search of sweep_distance(), without the call. Cells
+                    # beyond are blank.
+                    if D > 0:
+                        j = cells.find(0, i)
+                        distance = j - i if j >= 0 else size - i
+                    else:
+                        distance = i - cells.rfind(0, 0, i)
+                else:
+                    distance = sweep_distance(cells, i, D, stops, pattern)
+                if distance is None or distance > max_steps - steps:
+                    distance = max_steps - steps
+                else:
+                    # A sweep that keeps being short costs more to search
+                    # than to step. It is stepped for the rest of the run.
+                    gain[k] = min(gain[k] + distance - SWEEP_SHORT,
+                            SWEEP_PATIENCE)
+                    if gain[k] < -SWEEP_PATIENCE:
+                        total[k] = program.total[k]
+                i += distance * D
+                steps += distance
+        finally:
+            self.state_index = state
+            self.head = i - tape.origin
+            self.counter += steps
+        return steps
+
+
+    def run_cached(self, max_steps, cache):
+        """
+        Run a window at a time, using the outcomes held in cache. On a miss
+        the window is stepped and the outcome stored. An outcome that needs
+        more steps than remain is not used, the window is stepped instead,
+        so the counter is exact.
+        Returns the number of steps executed.
+        """
+        program = self.program
+        cache.bind(program)
+        halt = program.halt
+        tape = self.tape
+        width = cache.width
+        # Most configurations a window can have, without looping.
+        limit = len(program.states) * width * N_SYMBOLS ** width
+        steps = 0
+        while self.state_index != halt and steps < max_steps:
+            start = self.head - self.head % width
+            window = tape.window(start, start + width - 1).tobytes()
+            key = (self.state_index, self.head - start, window)
+            outcome = cache.get(key)
+            stuck = False
+            if outcome is None or outcome[3] > max_steps - steps:
+                cells = bytearray(window)
+                budget = min(max_steps - steps, limit)
+                state, i, n = run_window(program, cells, self.head - start,
+                        self.state_index, budget)
+                outcome = (bytes(cells), state, i, n)
+                if (state == halt or not 0 <= i < width) and key not in cache.entries:
+                    cache.put(key, outcome)
+                # Stopped in the window, with steps to spare: no transition.
+                stuck = state != halt and 0 <= i < width and n < budget
+
+            cells, state, i, n = outcome
+            for j in range(width):
+                if cells[j] != window[j]:
+                    tape[start + j] = cells[j]
+            self.state_index = state
+            self.head = start + i
+            self.counter += n
+            steps += n
+            if stuck:
+                self.undefined = (program.states[state], SYMBOLS[cells[i]])
+                break
+        return steps
+
+
+    def run_until(self, predicate, max_steps=MAX_ITERATION):
+        """
+        Step until the machine stops, max_steps have been executed or
+        predicate(engine) returns True. predicate may be None.
+        Returns the number of steps executed.
+        """
+        steps = 0
+        while steps < max_steps and self.step():
+            steps += 1
+            if predicate is not None and predicate(self):
+                break
+        return steps
+
+
+    def decide(self, max_steps=MAX_ITERATION):
+        """
+        Step, like run_until(), but stop as soon as the machine provably
+        never halts. Returns a Verdict. See LoopDetector.
+        """
+        detector = LoopDetector(self)
+        for _ in range(max_steps):
+            verdict = detector.step()
+            if verdict is not None:
+                return verdict
+        return self.verdict()
+
+
+    def verdict(self):
+        """
+        Return the Verdict for the machine as it stands: HALTS, UNDEFINED or,
+        if it could carry on, BUDGET.
+        """
+        if self.halted:
+            return Verdict(HALTS, self.counter)
+        if self.undefined is not None:
+            return Verdict(UNDEFINED, self.counter)
+        return Verdict(BUDGET, self.counter)
+
+
+    def cycle_start(self, start, period):
+        """
+        Return the counter value at which a cycle of period steps starts,
+        given start, the (state, head, counter, tape) that a LoopDetector
+        began with. Two copies of the machine, period steps apart, are stepped
+        until their configurations are the same.
+        """
+        copies = []
+        for lead in (0, period):
+            engine = TuringEngine(self.program, None)
+            engine.state_index, engine.head, engine.counter = start[:3]
+            engine.tape = start[3].copy()
+            fingerprint = engine.tape.fingerprint()
+            for _ in range(lead):
+                fingerprint = step_fingerprint(engine, fingerprint)
+            copies.append([engine, fingerprint])
+
+        (a, fa), (b, fb) = copies
+        while not (a.state_index == b.state_index and a.head == b.head
+                and fa == fb and a.tape.contents() == b.tape.contents()):
+            fa = step_fingerprint(a, fa)
+            fb = step_fingerprint(b, fb)
+        return a.counter
+
+
+    def tape_string(self):
+        """
+        Return the tape contents, ignoring leading and trailing underscores.
+        """
+        return str(self.tape)
+
+
+    def fields(self):
+        """
+        Return the blocks of data on the tape that are separated by
+        underscore delimiters.
+        """
+        return list(filter(None, self.tape_string().split(BLANK)))
+
+
+if __name__ == "__main__":
+    sys.exit("\nNote: {} is a python library, and not a stand-alone program."
+            .format(sys.argv[0]))
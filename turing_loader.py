@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+#
+# turing_loader.py
+# Requires: turing_engine.py, turing_program.py
+#
+# Load Turing code from a data file, rather than from a function in
+# turing_program.py. The compiled program is cached on disk, keyed by a hash
+# of the file's contents, so a large program is only parsed and compiled
+# once.
+#
+"""
+Text format, one transition or comment per line, with the same meaning as
+δ[state, read] = next state, write, move in turing_program.py:
+
+    # Lines starting with # are ignored.
+    0, c: State 0: Move right to end of first block of data
+    0, 0 -> 0, 0, r
+    0, 1 -> 0, 1, r   # Move right if ones
+    0, _ -> 1, _, r
+
+JSON format, for programs written by other programs:
+
+    {"comments": {"0": "State 0: Move right..."},
+     "delta": [["0", "0", "0", "0", "r"], ["0", "_", "1", "_", "r"]]}
+
+A comment is the rest of its line, kept as written, so it may contain "->"
+or "#". A line break in a comment is written as \\n and a backslash as \\\\.
+
+Files ending .json are JSON, anything else is text. As in turing_program.py
+everything is lower cased.
+
+Usage:
+
+    from turing_loader import load_program
+    program = load_program("addition.tm")   # A CompiledProgram
+    engine = TuringEngine(program, "11_10")
+
+    python3 turing_loader.py addition -o addition.tm   # Export a function
+    python3 turing_loader.py addition.tm               # Load and check
+    python3 turing_loader.py bb.tm --data _            # Check from a blank tape
+
+Cached programs are pickled into a __turing_cache__ directory next to the
+program file. Like __pycache__ it may be deleted at any time, and it should
+only be trusted as much as the directory it is in.
+"""
+import sys
+import os
+import re
+import json
+import time
+import pickle
+import hashlib
+import argparse
+
+from turing_engine import compile_program, validate_program, COMMENT, N_SYMBOLS
+
+CACHE_DIR = "__turing_cache__"
+# Changed whenever CompiledProgram or parsing changes, so old cache entries
+# are unused.
+CACHE_VERSION = b"4"
+
+# "state, c: comment". One space after the colon is part of the format.
+COMMENT_LINE = re.compile(r"^\s*([^\s,#][^,]*?)\s*,\s*[cC]\s*: ?(.*)$")
+ESCAPES = {"n": "\n", "r": "\r"}
+
+
+def parse_text(text, name="<text>"):
+    """
+    Return the trf dictionary of Turing code in the text format.
+    Raises ValueError, with the line number, for a line that is not a
+    comment or a transition.
+    """
+    trf = {}
+    for number, line in enumerate(text.splitlines(), 1):
+        # A comment may hold anything, even "->" or "#", so it is matched
+        # first, and its text is kept as written.
+        match = COMMENT_LINE.match(line)
+        if match:
+            trf[match.group(1).lower(), COMMENT] = unescape(match.group(2))
+            continue
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            left, right = line.split("#")[0].split("->")
+            state, symbol = (item.strip().lower() for item in left.split(","))
+            q, Y, D = (item.strip().lower() for item in right.split(","))
+            trf[state, symbol] = (q, Y, D)
+        except ValueError:
+            raise ValueError("{}:{}: expected 'state, read -> next, write, "
+                    "move' or 'state, c: comment', got: {}"
+                    .format(name, number, line)) from None
+    return trf
+
+
+def escape(comment):
+    """
+    A comment on one line. Backslashes and line breaks are escaped.
+    """
+    return (str(comment).replace("\\", "\\\\").replace("\n", "\\n")
+            .replace("\r", "\\r"))
+
+
+def unescape(comment):
+    """
+    The inverse of escape().
+    """
+    return re.sub(r"\\(.)", lambda m: ESCAPES.get(m.group(1), m.group(1)),
+            comment)
+
+
+def parse_json(text, name="<json>"):
+    """
+    Return the trf dictionary of Turing code in the JSON format.
+    """
+    try:
+        data = json.loads(text)
+        trf = {(str(state).lower(), COMMENT): str(comment)
+                for state, comment in data.get("comments", {}).items()}
+        for state, symbol, q, Y, D in data["delta"]:
+            trf[str(state).lower(), str(symbol).lower()] = (
+                    str(q).lower(), str(Y).lower(), str(D).lower())
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("{}: not a JSON Turing program: {}".format(name, e))
+    return trf
+
+
+def parse_program(text, name):
+    """
+    Parse text, in the format given by the file name's extension.
+    """
+    if name.lower().endswith(".json"):
+        return parse_json(text, name)
+    return parse_text(text, name)
+
+
+def cache_path(path, content):
+    """
+    The cache file of a program file with this content.
+    """
+    digest = hashlib.sha256(CACHE_VERSION + b"\0" + content).hexdigest()
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR,
+            digest + ".pickle")
+
+
+def load_program(path, cache=True):
+    """
+    Load Turing code from a file. Returns a CompiledProgram.
+    With cache, the compiled program is read from, or written to, the cache.
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    cached = cache_path(path, content) if cache else None
+    if cached:
+        try:
+            with open(cached, "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass
+
+    program = compile_program(parse_program(content.decode("utf-8"), path))
+    if cached:
+        try:
+            os.makedirs(os.path.dirname(cached), exist_ok=True)
+            temp = cached + ".tmp"
+            with open(temp, "wb") as f:
+                pickle.dump(program, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp, cached)
+        except OSError:
+            # A read only directory. Carry on without the cache.
+            pass
+    return program
+
+
+def format_text(trf):
+    """
+    Return a trf dictionary in the text format. Each state's comment comes
+    before its transitions.
+    """
+    lines = []
+    for (state, symbol), value in trf.items():
+        if str(symbol).lower() == COMMENT:
+            if lines:
+                lines.append("")
+            lines.append("{}, {}: {}".format(state, COMMENT, escape(value)))
+        else:
+            lines.append("{}, {} -> {}, {}, {}".format(state, symbol, *value))
+    return "\n".join(lines) + "\n"
+
+
+def format_json(trf):
+    """
+    Return a trf dictionary in the JSON format.
+    """
+    comments = {}
+    delta = []
+    for (state, symbol), value in trf.items():
+        if str(symbol).lower() == COMMENT:
+            comments[str(state)] = value
+        else:
+            delta.append([str(state), str(symbol)] + [str(v) for v in value])
+    return json.dumps({"comments": comments, "delta": delta}, indent=1) + "\n"
+
+
+def save_program(trf, path):
+    """
+    Write a trf dictionary to a file, in the format given by its extension.
+    """
+    if path.lower().endswith(".json"):
+        text = format_json(trf)
+    else:
+        text = format_text(trf)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+            description="Load a Turing program file, or export a function "
+            "of turing_program.py to one.")
+    parser.add_argument("program",
+            help="A program file, or a turing_program.py function name "
+            "without the function_ prefix. E.g. addition")
+    parser.add_argument("-o", "--output", default=None,
+            help="Export to this file, .json for JSON, otherwise text")
+    parser.add_argument("--data", default=None,
+            help="Check with this initial tape. By default any symbol may "
+            "be on it")
+    parser.add_argument("--state", default="0",
+            help="Check from this start state (default 0)")
+    parser.add_argument("--no-cache", action="store_true",
+            help="Don't read or write the compiled program cache")
+    args = parser.parse_args(argv)
+
+    if args.output:
+        import turing_program
+        function = getattr(turing_program, "function_" + args.program, None)
+        if function is None:
+            sys.exit("Unknown program: {}".format(args.program))
+        save_program(function(), args.output)
+        print("Written to {}".format(args.output))
+        return
+
+    start = time.perf_counter()
+    program = load_program(args.program, not args.no_cache)
+    seconds = time.perf_counter() - start
+    transitions = sum(1 for q in program.next_state[:program.halt * N_SYMBOLS] if q >= 0)
+    print("{}: {} states, {} transitions, loaded in {:.3f} s".format(
+            args.program, len(program.states) - 1, transitions, seconds))
+    validation = validate_program(program, args.state, args.data)
+    print(validation)
+    if not validation.total:
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
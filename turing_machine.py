@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 #
 # turing_machine.py
-# Requires: turing_program.py
+# Requires: turing_program.py, turing_registry.py
 #
 # Using a GUI simulate a Turing machine.
 # Includes a calculator style user interface to the Turing machine.
@@ -19,38 +19,25 @@
 
 import tkinter as tk
 from tkinter import ttk
+from tkinter import filedialog
 import sys
 import time
 
 try:
-    import turing_program
+    from turing_registry import get_program, arity
+    from turing_engine import (TuringEngine, LoopDetector, Profile, Verdict,
+            SYMBOLS, BUDGET, validate_program)
+    from turing_trace import TextSink, TraceReader, SUMMARY
+    from turing_snapshot import History
 except:
-    print("This program, {}, requires the file 'turing_program.py' to reside "
-            "in the directory, '{}'.".format(sys.argv[0], sys.path[0]))
+    print("This program, {}, requires the files 'turing_program.py', "
+            "'turing_registry.py', 'turing_engine.py', 'turing_trace.py' and 'turing_snapshot.py' "
+            "to reside in the directory, '{}'."
+            .format(sys.argv[0], sys.path[0]))
     sys.exit("\nExiting...")
 
-# Import Turing code as a dictionary. Eg.
-# {(0, 'c'): 'State 0:  Move right to end of first block of data',
-# (0, 0): (0, 0, 'r'), (0, 1): (1, 1, 'r'), (0, '_'): (1, '_', 'r'), ...}
-
-# Load Turing functions (python dictionaries) from turing _program library.
-# Unary opration functions - One operand
-dec = turing_program.function_dec()
-inc = turing_program.function_inc()
-p3 = turing_program.function_p3()
-p4 = turing_program.function_p4()
-
-# Binary operations functions - two operands
-addition = turing_program.function_addition()
-subtraction = turing_program.function_subtraction()
-multiplication = turing_program.function_multiplication()
-division = turing_program.function_division()
-p5 = turing_program.function_p5()
-p6 = turing_program.function_p6()
-
-# Function only
-bb3 = turing_program.function_busy_beaver_3()
-bb4 = turing_program.function_busy_beaver_4()
+# Turing code is in turing_program.py. Each program is compiled by
+# turing_registry.py the first time its button is pressed.
 
 
 # Label Constants
@@ -64,6 +51,13 @@ F1AA_TEXT = "10"
 L1AA_TEXT = "0"
 F1B_TEXT = "Instruction Counter and Code Information"
 F1C_TEXT = "Instruction Comment"
+F1D_TEXT = "Trace and History"
+F1D_OPEN_TEXT = "Open"
+F1D_HISTORY_TEXT = "History"
+F1E_TEXT = "Transition Heat"
+F1E_STATE_TEXT = "State"
+F1E_STEPS_TEXT = "Steps"
+F1E_COUNT_TEXT = "Count steps"
 
 F2A_TEXT = "Display"
 F2A1_TEXT = "Hex"
@@ -71,6 +65,7 @@ F2A2_TEXT = "Binary"
 F2A3_TEXT = "Decimal"
 F2B_TEXT = "Input"
 F2B1_TEXT = "Speed"
+F2B1_RATE_TEXT = "Steps/frame"
 
 F1BL1_TEXT = "Counter"
 F1BL2_TEXT = "Instruction"
@@ -91,6 +86,8 @@ P5_TEXT = "P5"
 P6_TEXT = "P6"
 P7_TEXT = "Go"
 P8_TEXT = "Stop"
+P9_TEXT = "Step"
+P10_TEXT = "Back"
 
 # Calculator F-buttons text
 F1_TEXT = "Inc"
@@ -103,12 +100,38 @@ F7_TEXT = "="
 F8_TEXT = "Clear"
 
 
+# Expand r, l, n for display.
+DIRECTIONS = {"r": "right", "l": "left", "n": "none"}
+
 # Default settings.
 TAPE_RANGE = 10 # Default.
 TAPE_RANGE = 16 # 16 is better
-# Tape length may be changed. Default of 1000 is a range from -500 to +500.
-TAPE_LENGTH = 1000
+# The tape itself is held by the TuringEngine. See turing_engine.py
 MAX_ITERATION = 9999
+# Printed trace of each run. STEP prints every step. See turing_trace.py
+TRACE_LEVEL = SUMMARY
+# Steps that can be stepped back. See turing_snapshot.History
+HISTORY_SIZE = 100000
+# Milliseconds per step at the bottom of the speed slider.
+SLOWEST_STEP_MS = 2000
+# Turbo. When steps are due faster than the frame rate, as many steps as
+# fit are run between repaints, and only the latest state is shown.
+FRAME_MS = 1000 // 60
+FRAME_WORK = 0.75  # Fraction of a frame spent stepping. The rest repaints.
+MAX_STEPS_PER_FRAME = 100000  # Default upper bound. Set by the user.
+# Rows of the transition heat table. Further states are not shown.
+HEAT_MAX_STATES = 24
+HEAT_UNDEFINED = "#d9d9d9"  # Background of a cell with no transition
+
+
+def heat_colour(fraction):
+    """
+    Colour of a heat table cell. White for 0, through yellow, to red for 1.
+    """
+    fraction = min(max(fraction, 0), 1)
+    if fraction < 0.5:
+        return "#ffff{:02x}".format(int(255 * (1 - 2 * fraction)))
+    return "#ff{:02x}00".format(int(255 * (2 - 2 * fraction)))
 
 
 class Turing(ttk.Frame):
@@ -124,7 +147,15 @@ class Turing(ttk.Frame):
         self.parent.wm_title(TITLE)
         #self.init_tape()
 
-        self.head_position = 0
+        # The engine executes the Turing code. This frame only observes it.
+        self.engine = TuringEngine()
+        self.engine.subscribe(self.display_step)
+        self.trace = TextSink(sys.stdout, TRACE_LEVEL)
+        self.trace.attach(self.engine)
+        # The history is attached only while History is ticked.
+        self.history = History(self.engine, HISTORY_SIZE)
+        # The profile is attached only while Count steps is ticked.
+        self.profile = Profile(self.engine)
 
         self.is_operand_1 = False
         self.is_operand_2 = False
@@ -134,7 +165,18 @@ class Turing(ttk.Frame):
         self.operand_2 = ""
         self.operator = ""
 
-        self.delay=0
+        # Execution is driven by Tk after() timers. See run_turing_program()
+        self.detector = None    # LoopDetector of the loaded program
+        self.running = False    # True between Go and Stop
+        self.job = None         # Pending after() id
+        self.steps_left = 0
+        self.max_iter = MAX_ITERATION
+        self.step_ms = 0        # Target milliseconds per step
+        self.step_due = 0       # perf_counter() time the step was due
+        self.turbo = False      # True while a frame of steps is run
+        self.shown_field = None # First field shown on the hex/bin/dec labels
+        self.reader = None      # TraceReader of a trace file being scrubbed
+        self.updating_history = False  # True while the scrubber is set
 
         self.setup_frame_1()
         self.setup_tape_frame()
@@ -142,6 +184,8 @@ class Turing(ttk.Frame):
 
         #self.update_hex_bin_dec_display()
         self.setup_information_display()
+        self.setup_trace_frame()
+        self.setup_heat_frame()
 
         self.reset_tape()
 
@@ -170,223 +214,333 @@ class Turing(ttk.Frame):
         Edit this function to autostart a function under test.
         Remove the comment above from #self.auto_start()
         """
-        self.state = "0" #str(state)
-
-        # Define thew autostart function.
-        self.trf = {}
-        self.trf = dec #inc #dec #addition #bb4 #bb4 # bb3 addition
+        # Define the autostart function.
+        program = get_program("dec") #inc #dec #addition #bb4 #bb4 # bb3 addition
 
         # Setup the initial data.
         #initial_data = '11_10'
         #initial_data = '_'
         initial_data = '11111'
 
+        self.setup_turing_machine(program, initial_data)
+        self.run_turing_program()
 
-        # Create self.tape_dict as a dictionary with keys from -500 to +501
-        # The value for a key can be 0 or 1 or the underscore / delimiter.
-        self.tape_dict = {}
-        for i in range((TAPE_LENGTH // 2 * -1), (TAPE_LENGTH // 2 + 1)):
-            self.tape_dict[i] = "_"
 
-        # Set the midpoint of the tape to a value of 0
-        self.tape_dict[0] = "0"
+    def setup_turing_machine(self, program, initial_data, state=0):
+        """
+        Load the program, the trf dictionary of Turing code, into the engine,
+        where it is compiled, and set the start state. If initial_data is None the tape is kept,
+        otherwise the tape is reset, the data written from position 0 and the
+        head set at the start point.
+        A program that fails validate_program() is still loaded, with a
+        warning on the trace.
+        """
+        self.close_trace()
+        self.engine.load(program, initial_data, state)
+        validation = validate_program(self.engine.program, state, initial_data)
+        if not validation.ok:
+            for line in str(validation).splitlines():
+                self.trace.note("Warning: {}".format(line))
+        self.build_heat_table()
+        self.move_tape()
 
-        # Position the head at the mid point of the tape. i.e. 0.
-        self.head_position = 0
 
-        # Write intital data starting at 0 position on the tape.
-        for index, value in enumerate(initial_data):
-            self.tape_dict[index] = value
+    def display_step(self, engine):
+        """
+        Observer of the engine. Called after each step has been executed.
+        engine.last holds the details of the step:
+        (counter, head position, state, read, next state, write, direction)
 
-        self.run_turing_program()
+        self.f1bl11.configure(text="")  # Counter
+        self.f1bl12.configure(text="")  # Instruction
+        self.f1bl13.configure(text="")  # Head Position
+        self.f1bl14.configure(text="")  # Current State
+        self.f1bl15.configure(text="")  # Next State
+        self.f1bl16.configure(text="")  # Read
+        self.f1bl17.configure(text="")  # Write
+        self.f1bl18.configure(text="Right") # Direction
+        self.f1cl21.configure(text=engine.program.comments.get(p))  # Comment
+        """
+        if self.turbo:
+            # Only the last step of a frame is shown. See run_frame()
+            return
+        iteration_counter, head_position, p, X, q, Y, D = engine.last
+        comment = engine.program.comments.get(p)
 
+        # Expand r, l, n.
+        direction = DIRECTIONS.get(D, D)
 
-    def setup_turing_machine(self, program, initial_data, state=0):
-        """
-        Initialize tape dictionary, load data, select function, load functions
-        code into trf dictionary. set start state.
-        Set head at start point
-        """
-        self.trf = {}  # trf - transition function dictionary. Turing code
+        # Counter, Instruction, Head Position, Current State, Next State,
+        # Read, Write, Direction, Comment
+        self.show_info((iteration_counter, "{}{}".format((p, X), (q, Y, D)),
+                head_position, p, q, X, Y, direction, comment))
+
+        # Update so that what was written can be seen. The head is moved on
+        # by move_head(), half a step later.
+        self.move_tape(head_position)
 
-        self.state = str(state)
+        # Update the display with first field of the contents of tape.
+        # The tape tracks the field as it is written, so this is not a scan.
+        field = engine.tape.first_field()
+        if field != self.shown_field:
+            self.update_hex_bin_dec_display_code_running(field)
+            self.shown_field = field
 
-        # Create self.tape_dict as a dictionary with keys from -500 to +501
-        # The value for a key can be 0 or 1 or the underscore / delimiter.
-        self.tape_dict = {}
-        for i in range((TAPE_LENGTH // 2 * -1), (TAPE_LENGTH // 2 + 1)):
-            self.tape_dict[i] = "_"
+        self.update_heat()
 
-        # Set the midpoint of the tape to a value of 0
-        self.tape_dict[0] = "0"
 
-        # Position the head at the mid point of the tape. i.e. 0.
-        self.head_position = 0
+    def run_turing_program(self, max_iter=MAX_ITERATION):
+        """
+        Run a Turing program.
+        Nothing blocks the Tk mainloop. Each step is scheduled with after()
+        by step_timer(), so Stop, Go and Step are handled as they are
+        pressed. The program ends at a halt instruction, as soon as it
+        provably loops for ever, or after max_iter steps.
+        """
+        self.stop_cb()
+        self.history.reset()
+        self.profile.reset()
+        self.update_heat()
+        self.trace.start(self.engine)
+        self.detector = LoopDetector(self.engine)
+        self.max_iter = max_iter
+        self.steps_left = max_iter
+        self.go_cb()
+
+
+    def go_cb(self):
+        """
+        Go button. Run, or carry on running, the loaded program.
+        """
+        if self.detector is None or self.running:
+            return
+        self.running = True
+        self.step_due = time.perf_counter()
+        self.job = self.after(0, self.step_timer)
 
-        # Write intital data starting at 0 position on the tape.
-        for index, value in enumerate(initial_data):
-            self.tape_dict[index] = value
 
-        #print(self.tape_dict)
+    def stop_cb(self):
+        """
+        Stop button. Pause the program. Go carries on from here.
+        """
+        self.running = False
+        if self.job is not None:
+            self.after_cancel(self.job)
+            self.job = None
+        self.update_history_scrubber()
 
-        self.trf = program
 
-        #print("self.trf:", self.trf)
-        #print("self.trf['0','1']:", self.trf["0","1"])
-        #sys.exit()
+    def step_cb(self):
+        """
+        Step button. Pause the program and execute a single step.
+        """
+        self.stop_cb()
+        if self.detector is not None:
+            self.step_due = time.perf_counter()
+            self.show_step()
 
 
-    def step(self, iteration_counter):
+    def step_back_cb(self):
+        """
+        Back button. Pause the program and undo the last step. Ignored while
+        a trace is shown, as the history is of the engine, not the trace, and
+        while History is not ticked.
         """
-        Execution of each step
-        Requires:
-        self.tape, (1001 underscores with data starting at 500 - string
-        self.tape_dict = -500 to +500
-        self.trf (loaded with program),
-        self.state, (Initially 0 - First state is 0)
-        self.head_position (Int - position on the tape)
-        iteration_counter ( passed by run() )
+        self.stop_cb()
+        if self.reader is not None or not self.record_history.get():
+            return
+        if self.history.step_back():
+            self.rewound()
 
-        self.f1bl11.configure(text="")  # Counter
-        self.f1bl12.configure(text="")  # Instruction
-        self.f1bl13.configure(text="")  # Head Position
-        self.f1bl14.configure(text="")  # Current State
-        self.f1bl15.configure(text="")  # Next State
-        self.f1bl16.configure(text="")  # Read
-        self.f1bl17.configure(text="")  # Write
-        self.f1bl18.configure(text="Right") # Direction
-        self.f1cl21.configure(text=self.trf.get((self.state, "c")))  # Comment
-
-        # TODO: Reflect Tape content in display
-        """
-        if self.state != 'h':
-         # assert self.head_position >= 0 and self.head_position < len(self.tape) here
-            """
-            X = self.tape[self.head_position]
-            print("type(self.head_position):", type(self.head_position))
-            print("First X", X ) # string
-            print("type(self.tape):", type(self.tape))  # string
-            """
-            self.f1bl11.configure(text=iteration_counter)  # Counter
-            self.f1bl13.configure(text=self.head_position)  # Head Position
-            self.f1bl14.configure(text=self.state)  # Current State
-
-
-            # Read the data at the head position. E.g. "0", "1" or "_"
-            X = self.tape_dict[self.head_position]
-            self.f1bl16.configure(text=X)  # Read
-            print("self.state:", self.state, ", X:", X)
-
-            # Print the comment...
-            self.f1cl21.configure(text=self.trf.get((self.state, "c"))) # Comment
-            print(self.trf.get((self.state, "c")))
-
-            # Get the action items of the state and character read from tape.
-            action = self.trf.get((self.state, X))
-
-            #s = "δ{}={})".format((self.state, X), self.trf.get((self.state, X)))
-            s = "{}{}".format((self.state, X), self.trf.get((self.state, X)))
-            self.f1bl12.configure(text=s)  # Instruction
-            #self.f1bl12.configure(text=(self.state, X) + self.trf.get((self.state, X)))  # Instruction
-
-            p = self.state  # Current state
-
-            print("action:", action)
-            if action:
-                # Get 3 x items, next state, character to write, tape dictection from action tuple
-                q, Y, D = action
-                self.f1bl15.configure(text=q)  # Next State
-                self.f1bl17.configure(text=Y)  # Write
-                # Expand r, l, n.
-                if D == "r":
-                    direction = "right"
-                elif D == "l":
-                    direction = "left"
-                elif D == "n":
-                    direction = "none"
-                else:
-                    direction = D
-                self.f1bl18.configure(text=direction) # Direction
-                self.update()
 
-                # Write change of 0,1 or _ to tape
-                self.tape_dict[self.head_position] = Y
-                # Update so that what was written can be seen
-                self.move_tape()
-                # Pause
-                time.sleep(self.delay)
-                self.update()
+    def scrub_history_cb(self, value):
+        """
+        History scrubber moved. Go back, or forward, to that step.
+        """
+        n = int(float(value))
+        if (n == self.engine.counter or self.running or self.updating_history
+                or self.reader is not None or not self.record_history.get()):
+            return
+        if self.history.goto(n):
+            self.rewound()
+
 
-                # If L or R move head. Else N for no move.
-                if D != 'n':  # * is "No move". Change to use "n" for "No move"
-                    self.head_position = self.head_position + (1 if D == 'r' else -1)
+    def rewound(self):
+        """
+        The engine has been moved to another step of its history. Show it,
+        and let Go and Step carry on from there.
+        """
+        engine = self.engine
+        self.detector = LoopDetector(engine)
+        self.steps_left = self.max_iter - engine.counter
+        self.move_tape()
+        self.show_info((engine.counter, "", engine.head, engine.state, "", "",
+                "", "", engine.program.comments.get(engine.state)))
+        field = engine.tape.first_field()
+        if field != self.shown_field:
+            self.update_hex_bin_dec_display_code_running(field)
+            self.shown_field = field
+        self.update_history_scrubber()
+
+
+    def update_history_scrubber(self):
+        """
+        Set the range of the history scrubber, and its position, to the
+        engine's history.
+        """
+        history = self.history
+        # Moving the scrubber here is not a request to go to a step.
+        self.updating_history = True
+        try:
+            self.history_scrubber.configure(from_=history.earliest, to=history.latest)
+            self.history_scrubber.set(self.engine.counter)
+        finally:
+            self.updating_history = False
+        self.label_history.configure(text="{} / {}".format(self.engine.counter, history.latest))
+
+
+    def record_history_cb(self):
+        """
+        History ticked, or cleared. The history observes the engine only
+        while it is ticked, and starts from the step it is ticked at.
+        """
+        self.history.reset()
+        if self.record_history.get():
+            self.history.attach()
+        else:
+            self.history.detach()
+        self.update_history_scrubber()
 
-            print("self.head_position:", self.head_position)
 
-            # Move the head position
-            self.move_tape()
-            # Pause
-            time.sleep(self.delay)
-            self.update()
+    def count_steps_cb(self):
+        """
+        Count steps ticked, or cleared. The profile observes the engine, and
+        the heat table is shown, only while it is ticked. Counting starts
+        from the step it is ticked at.
+        """
+        self.profile.reset()
+        if self.count_steps.get():
+            self.profile.attach()
+        else:
+            self.profile.detach()
+        self.build_heat_table()
 
-            # Set next state
-            self.state = q
 
-            print(iteration_counter, ":", p, X, q, Y, D, ":" )
+    def step_timer(self):
+        """
+        Timer callback. Show every step at slow speeds, otherwise run a
+        frame of steps.
+        """
+        self.job = None
+        if self.step_ms >= FRAME_MS:
+            self.show_step()
+        else:
+            self.run_frame()
 
-            # Perform the stop/go button polling routine
-            # Stop pressed?
-            if "pressed" in self.button_stop.state():
-                print("Stop pressed")
-                #self.root.update()
 
-                while True:
-                    # Go pressed?
-                    if "pressed" in self.button_go.state():
-                        print("Button Go pressed. Exiting Stop loop")
-                        break
-                    print("Stop loop")
-                    self.parent.update()
-                    time.sleep(0.2)
+    def show_step(self):
+        """
+        Execute one step. Then, half a step later, move the head on the
+        display with move_head().
+        """
+        if self.steps_left <= 0:
+            self.finish(Verdict(BUDGET, self.engine.counter))
+            return
+        self.steps_left -= 1
+        verdict = self.detector.step()
+        if verdict is not None:
+            self.move_tape()
+            self.finish(verdict)
+            return
+        self.job = self.after(self.delay_ms(0.5), self.move_head)
 
 
-    def run_turing_program(self, max_iter=MAX_ITERATION):
+    def move_head(self):
         """
-        Run a Turing program.
-        Test for a halt instruction to force exit from program
-        Test for a loop witrh excessive iterations and no halt.
-        """
-        iteration_counter = 0
-        while self.state != 'h' and iteration_counter < max_iter: # prevent infinite loop
-            self.step(iteration_counter)
-            iteration_counter += 1
-
-            # Get all data from the tape. Ignore leading and trailing underscores
-            for k, v in self.tape_dict.items():
-                if v != "_":
-                    tape_data_start = k
+        Show the head in its new position and schedule the next step.
+        """
+        self.job = None
+        self.move_tape()
+        if self.running:
+            delay = self.delay_ms(1)
+            # Due times are kept from step to step, so the time taken by the
+            # display does not slow the step rate. If behind, don't catch up.
+            self.step_due = max(self.step_due + self.step_ms / 1000,
+                    time.perf_counter())
+            self.job = self.after(delay, self.step_timer)
+
+
+    def run_frame(self):
+        """
+        Turbo. Run as many steps as are due in one frame, up to the upper
+        bound set by the user, or until FRAME_WORK of the frame has been
+        used. Then repaint the latest state once and schedule the next frame.
+        """
+        start = time.perf_counter()
+        end = start + FRAME_WORK * FRAME_MS / 1000
+        limit = min(self.steps_per_frame_limit(), self.steps_left)
+        if self.step_ms:
+            limit = min(limit, FRAME_MS // self.step_ms)
+
+        detector = self.detector
+        verdict = None
+        steps = 0
+        self.turbo = True
+        try:
+            while steps < limit:
+                verdict = detector.step()
+                if verdict is not None:
                     break
-            for k, v in reversed(self.tape_dict.items()):
-                if v != "_":
-                    tape_data_end = k
+                steps += 1
+                # Read the clock now and then, not every step.
+                if steps & 255 == 0 and time.perf_counter() > end:
                     break
-            s = ""
-            for i in range(tape_data_start, tape_data_end + 1):
-                s += self.tape_dict[i]
+        finally:
+            self.turbo = False
+        self.steps_left -= steps
+
+        # Repaint the latest state only.
+        if self.engine.last is not None:
+            self.display_step(self.engine)
+        self.move_tape()
+        self.label_rate.config(text=steps)
+
+        if verdict is None and self.steps_left <= 0:
+            verdict = Verdict(BUDGET, self.engine.counter)
+        if verdict is not None:
+            self.finish(verdict)
+            return
+        if self.running:
+            delay = start + FRAME_MS / 1000 - time.perf_counter()
+            self.job = self.after(max(0, int(delay * 1000)), self.step_timer)
+
+
+    def steps_per_frame_limit(self):
+        """
+        The upper bound on steps per frame entered by the user.
+        """
+        try:
+            return max(1, int(self.max_per_frame.get()))
+        except (ValueError, tk.TclError):
+            return MAX_STEPS_PER_FRAME
+
 
-            # Update the display with first field of the contents of tape
-            # S could be of zero length?
-            # S could contain one or more underscore delimiters, if so pass the first
-            s_list = s.split("_")
-            if len(s_list) != 0:
-                print("s_list[0]:", s_list[0])
-                self.update_hex_bin_dec_display_code_running(s_list[0])
+    def delay_ms(self, fraction):
+        """
+        Milliseconds from now until fraction of a step after the current
+        step was due.
+        """
+        due = self.step_due + fraction * self.step_ms / 1000
+        return max(0, int((due - time.perf_counter()) * 1000))
 
-            # Display data
-            print("Data length:", len(s))
-            print(iteration_counter, ":", s, ":", self.state)  # E.g. 101 : 10000___1 : 5
 
-        #print(iteration_counter, ":", s, ":", self.state)  # E.g. 101 : 10000___1 : 5
+    def finish(self, verdict):
+        """
+        The program has stopped, or provably never will.
+        """
+        self.stop_cb()
+        self.detector = None
+        self.trace.finish(self.engine, verdict)
 
 
     def calculator_cb(self, button):
@@ -410,8 +564,6 @@ class Turing(ttk.Frame):
         """
 
         if button in ["0","1","2","3","4","5","6","7","8","9","A","B","C","D","E","F"]:
-            print("button is numeric: {}".format(button))
-
             if self.is_operator:
                 self.is_operand_2 = True
                 self.operand_2 += button
@@ -419,33 +571,41 @@ class Turing(ttk.Frame):
                 self.is_operand_1 = True
                 self.operand_1 += button
 
-            print(self.operand_1, self.operator, self.operand_2)
             self.update_hex_bin_dec_display()
 
-        elif button in ["BB3", "BB4"]:
+        elif button == "=":
+            # Binary operator with both operands entered.
+            if not self.is_operand_2 or arity(self.operator) != 2:
+                return
+            self.is_execute = True
+
+            self.trace.note("Execute: {} {} {} (decimal {} {} {})".format(
+                    self.operand_1, self.operator, self.operand_2,
+                    int(self.operand_1, 16), self.operator, int(self.operand_2, 16)))
+
+            self.update_hex_bin_dec_display()
+
+            # Binary data to write to tape. [2:] removes the 0b
+            tape_input_data_str = bin(int(self.operand_1, 16))[2:] + "_" + bin(int(self.operand_2, 16))[2:]
+
+            self.setup_turing_machine(get_program(self.operator), tape_input_data_str)
+            self.run_turing_program()
+
+        elif button == "Clear":
+            self.reset_tape() # Also clears variables.
+
+        elif arity(button) == 0:
             # Neither unary or binary. Todo: Clear all data, no zero
             # Busy Beaver 3 state or 4 state
-            print("button is operator: {}".format(button))
-
             self.is_operator = True
             self.operator = button
-            print(self.operand_1, self.operator)
-
-            # For BB3, setup and call the run_turing_prog
-            if self.operator =="BB3":
-                self.trf = bb3
-                self.state = "0"
-                self.run_turing_program()
+            self.trace.note("Execute: {}".format(self.operator))
 
-            # For BB4, setup and call the run_turing_prog
             # TODO: Code for bb4 needs to be fixed at the halt.
-            if self.operator =="BB4":
-                self.trf = bb4
-                self.state = "0"
-                self.run_turing_program()
+            self.setup_turing_machine(get_program(button), None)
+            self.run_turing_program()
 
-
-        elif button in ["Inc", "Dec", "P3", "P4"]:
+        elif arity(button) == 1:
             # Unary operators, only one operand is supplied.
             # Does not need = to start execution.
             # TODO: Add Square root, Negate, Complement, absolute?
@@ -453,62 +613,22 @@ class Turing(ttk.Frame):
             if not self.is_operand_1:
                 return
 
-            print("button is operator: {}".format(button))
-
             self.is_operator = True
             self.operator = button
-            print(self.operand_1, self.operator)
-
-
-            print("Unary Execute: ", self.operand_1, self.operator)
-            # [2:] removes the 0b in the returned binary string
-            print("Unary Execute: ", bin(int(self.operand_1, 16))[2:], self.operator, )
-            print("Unary Execute: ", int(self.operand_1, 16), self.operator,)
+            self.trace.note("Execute: {} {} (decimal {} {})".format(
+                    self.operand_1, self.operator,
+                    int(self.operand_1, 16), self.operator))
 
             self.update_hex_bin_dec_display()
 
-            # Write binary data to tape
-            for i in range((TAPE_LENGTH // 2 * -1), (TAPE_LENGTH // 2 + 1)):
-                self.tape_dict[i] = "_"
-
+            # Binary data to write to tape. [2:] removes the 0b
             tape_input_data_str = bin(int(self.operand_1, 16))[2:]
-            tape_input_data_list = list(tape_input_data_str)
-
-            for index, item in enumerate(tape_input_data_list):
-                self.tape_dict[index] = item
-
-            #print(self.tape_dict, len(self.tape_dict))
-            for index, i in enumerate(range(self.head_position -TAPE_RANGE, self.head_position + TAPE_RANGE + 1)):
-                self.tape_frames[index].config(text=str(i))
-                self.tape_labels[index].config(text=self.tape_dict[i])
-
-            # For Decrement, setup and call the run_turing_prog
-            if self.operator =="Dec":
-                self.trf = dec
-                self.state = "0"
-                self.run_turing_program()
-
-            # For Increment, setup and call the run_turing_prog
-            if self.operator =="Inc":
-                self.trf = inc
-                self.state = "0"
-                self.run_turing_program()
-
-            # For P3, setup and call the run_turing_prog
-            if self.operator =="P3":
-                self.trf = p3
-                self.state = "0"
-                self.run_turing_program()
-
-            # For P4, setup and call the run_turing_prog
-            if self.operator =="P4":
-                self.trf = p4
-                self.state = "0"
-                self.run_turing_program()
-
-        elif button in ["+", "-", "*", "//", "P5", "P6"]:
+
+            self.setup_turing_machine(get_program(button), tape_input_data_str)
+            self.run_turing_program()
+
+        else:
             # Binary operators. 2 x operands and then = to start execution
-            print("button is operator: {}".format(button))
             # Operand_1 must have been entered before operator.
             if not self.is_operand_1:
                 return
@@ -519,123 +639,223 @@ class Turing(ttk.Frame):
             self.is_operator = True
             self.operator = button
 
-            print(self.operand_1, self.operator)
             self.update_hex_bin_dec_display()
 
-        elif button == "=":
-            print("button is executor: {}".format(button))
-            self.is_execute = True
-
-            print("Execute: ", self.operand_1, self.operator, self.operand_2)
-            # [2:] removes the 0b in the returned binary string
-            print("Execute: ", bin(int(self.operand_1, 16))[2:], self.operator, bin(int(self.operand_2, 16))[2:],)
-            print("Execute: ", int(self.operand_1, 16), self.operator, int(self.operand_2, 16),)
 
-            self.update_hex_bin_dec_display()
+    def open_trace_cb(self):
+        """
+        Open button. Open a binary trace file, written by BinaryTraceSink,
+        and show its first step. The scrubber then moves through the trace.
+        """
+        path = filedialog.askopenfilename(title="Open Trace",
+                filetypes=[("Turing trace", "*.trace"), ("All files", "*")])
+        if not path:
+            return
+        try:
+            reader = TraceReader(path)
+        except (OSError, ValueError) as e:
+            print("Unable to open trace: {}".format(e))
+            return
 
-            # Write binary data to tape
-            for i in range((TAPE_LENGTH // 2 * -1), (TAPE_LENGTH // 2 + 1)):
-                self.tape_dict[i] = "_"
+        # Abandon any program that is running. The display shows the trace,
+        # on its own tape. The engine is left as it is.
+        self.stop_cb()
+        self.detector = None
+        self.close_trace()
+        self.history.reset()
+        self.update_history_scrubber()
+        self.reader = reader
+        self.scrubber.configure(from_=reader.first, to=reader.last)
+        self.scrubber.set(reader.first)
+        self.scrub_cb(reader.first)
 
-            tape_input_data_str = bin(int(self.operand_1, 16))[2:] + "_" + bin(int(self.operand_2, 16))[2:]
-            tape_input_data_list = list(tape_input_data_str)
-
-            for index, item in enumerate(tape_input_data_list):
-                self.tape_dict[index] = item
-
-            #print(self.tape_dict, len(self.tape_dict))
-            for index, i in enumerate(range(self.head_position -TAPE_RANGE, self.head_position + TAPE_RANGE + 1)):
-                self.tape_frames[index].config(text=str(i))
-                self.tape_labels[index].config(text=self.tape_dict[i])
-
-
-            # For addition, setup and call the run_turing_prog
-            if self.operator =="+":
-                self.trf = addition
-                self.state = "0"
-                self.run_turing_program()
-
-            # For subtraction, setup and call the run_turing_prog
-            if self.operator =="-":
-                self.trf = subtraction
-                self.state = "0"
-                self.run_turing_program()
-
-            # For multiplication, setup and call the run_turing_prog
-            if self.operator =="*":
-                self.trf = multiplication
-                self.state = "0"
-                self.run_turing_program()
-
-            # For division, setup and call the run_turing_prog
-            if self.operator =="//":
-                self.trf = division
-                self.state = "0"
-                self.run_turing_program()
-
-            # For P5 function, setup and call the run_turing_prog
-            if self.operator =="P5":
-                self.trf = p5
-                self.state = "0"
-                self.run_turing_program()
-
-             # For P6 function, setup and call the run_turing_prog
-            if self.operator =="P6":
-                self.trf = p6
-                self.state = "0"
-                self.run_turing_program()
 
-        elif button == "Clear":
-            print("button is command: {}".format(button))
-            self.reset_tape() # Also clears variables.
+    def close_trace(self):
+        """
+        Close the trace file being scrubbed, if any. The display is then the
+        engine's again.
+        """
+        if self.reader is None:
+            return
+        reader = self.reader
+        self.reader = None
+        reader.close()
+        self.scrubber.configure(from_=0, to=0)
+        self.label_trace.configure(text="")
 
 
-    def move_tape(self): #, direction):
+    def scrub_cb(self, value):
+        """
+        Scrubber moved. Show the configuration before step value of the
+        trace, and the step itself. The configuration is rebuilt on a Tape of
+        its own, so the engine is not changed. Ignored while a program is
+        loaded.
+        """
+        if self.reader is None or self.running or self.detector is not None:
+            return
+        reader = self.reader
+        n = int(float(value))
+        state, head, tape = reader.configuration(n)
+        self.move_tape(head, tape)
+        self.label_trace.configure(text="{} / {}".format(n, reader.last))
+
+        if n < reader.last:
+            counter, p, head, X, Y, D = reader.record(n)
+            q = reader.state(n + 1)
+            self.show_info((counter, "{}{}".format((p, X), (q, Y, D)), head, p,
+                    q, X, Y, DIRECTIONS.get(D, D), reader.comments.get(p)))
+        else:
+            self.show_info((n, "", head, state, "", "", "", "",
+                    reader.comments.get(state)))
+
+        field = tape.first_field()
+        if field != self.shown_field:
+            self.update_hex_bin_dec_display_code_running(field)
+            self.shown_field = field
+
+
+    def move_tape(self, head_position=None, tape=None):
         """
         TODO: Rename to tape_update ?
 
-        self.tape_dict appears to move right or left one position
-        self.tape_labels display a new section of self.tape_dict
+        The engine tape appears to move right or left one position
+        self.tape_labels display a new section of the engine tape
         and self.tape_frames get renumbered.
         Total labels is based on TAPE_RANGE.
-        direction = "L" or "R" from turing instruction
+        head_position defaults to the engine head position, and tape to the
+        engine tape.
         """
-
+        if head_position is None:
+            head_position = self.engine.head
+        if tape is None:
+            tape = self.engine.tape
+        # Symbol codes under the display. Reading them does not grow the tape.
+        window = tape.read(head_position - TAPE_RANGE, head_position + TAPE_RANGE)
+
+        # Only cells whose index or symbol differs from the shadow copy of
+        # the display are configured. Most Tk calls would be no-ops.
         # E.g. -16 to +16 of head position, when TAPE_RANGE = 16
-        for index, i in enumerate(range(self.head_position - TAPE_RANGE, self.head_position + TAPE_RANGE + 1)):
-            self.tape_frames[index].config(text=str(i))
-            self.tape_labels[index].config(text=self.tape_dict[i])
+        if self.shown_head != head_position:
+            for index, i in enumerate(range(head_position - TAPE_RANGE, head_position + TAPE_RANGE + 1)):
+                if self.shown_indexes[index] != i:
+                    self.tape_frames[index].config(text=str(i))
+                    self.shown_indexes[index] = i
+            self.shown_head = head_position
+        shown = self.shown_symbols
+        for index, code in enumerate(window):
+            if shown[index] != code:
+                self.tape_labels[index].config(text=SYMBOLS[code])
+                shown[index] = code
+
+
+    def show_info(self, values):
+        """
+        Update the nine information labels, Counter to Comment, in one
+        batch. Only labels whose text changed are configured.
+        """
+        for index, value in enumerate(values):
+            text = "" if value is None else str(value)
+            if self.shown_info[index] != text:
+                self.info_labels[index].configure(text=text)
+                self.shown_info[index] = text
+
+
+    def build_heat_table(self):
+        """
+        Make a row of the transition heat table for each state of the
+        loaded program, up to HEAT_MAX_STATES. Each cell shows δ[state, read]
+        and its share of the steps.
+        """
+        for widget in self.heat_widgets:
+            widget.destroy()
+        self.heat_widgets = []
+        self.heat_labels = {}
+        self.shown_heat = {}
+        if not self.count_steps.get():
+            return
+
+        program = self.engine.program
+        states = program.states[:program.halt]
+        for row, p in enumerate(states[:HEAT_MAX_STATES], 1):
+            label = ttk.Label(self.f1e, text=p, font=('Helvetica', 10), anchor="center")
+            label.grid(row=row, column=0, padx=(2, 2), pady=(1, 1))
+            self.heat_widgets.append(label)
+            for column, X in enumerate(SYMBOLS + (None,), 1):
+                label = tk.Label(self.f1e, text="", font=('Helvetica', 10), relief="groove", width=8, height=2)
+                label.grid(row=row, column=column, padx=(1, 1), pady=(1, 1))
+                self.heat_widgets.append(label)
+                # None is the State's total column.
+                self.heat_labels[p, X] = label
+        if len(states) > HEAT_MAX_STATES:
+            label = ttk.Label(self.f1e, text="+{} states".format(len(states) - HEAT_MAX_STATES), font=('Helvetica', 10))
+            label.grid(row=HEAT_MAX_STATES + 1, column=0, columnspan=5)
+            self.heat_widgets.append(label)
+        self.update_heat()
+
+
+    def update_heat(self):
+        """
+        Colour each cell of the heat table by its steps, white for none to
+        red for the most, and show its share of all steps. Only cells whose
+        text or colour changed are configured.
+        """
+        if not self.heat_labels:
+            return
+        profile = self.profile
+        program = self.engine.program
+        transitions = profile.transitions
+        states = profile.states() if profile.steps else {}
+        hottest = max(transitions.values(), default=0) or 1
+        hottest_state = max(states.values(), default=0) or 1
+        total = profile.steps or 1
+        for (p, X), label in self.heat_labels.items():
+            if X is None:
+                count = states.get(p, 0)
+                text = "{:.0%}".format(count / total) if count else ""
+                shown = (text, heat_colour(count / hottest_state))
+            else:
+                action = program.transition(p, X)
+                count = transitions.get((p, X), 0)
+                if action is None:
+                    shown = ("-", HEAT_UNDEFINED)
+                else:
+                    text = " ".join(action)
+                    if count:
+                        text += "\n{:.0%}".format(count / total)
+                    shown = (text, heat_colour(count / hottest))
+            if self.shown_heat.get((p, X)) != shown:
+                label.configure(text=shown[0], background=shown[1])
+                self.shown_heat[p, X] = shown
 
 
     def slider_changed(self, event):
         """
-        Top of slider is 0 - i.e. Fast 0 - no delay
-        Bottom of slider is 100 i.e. Slow 1 second delay.
+        Set the target step rate.
+        Top of slider is 0 - i.e. Fast, as many steps as the display allows.
+        Bottom of slider is 100 i.e. Slow, SLOWEST_STEP_MS per step.
         """
-        print("int(self.speed.get()):", int(self.speed.get()))
-        self.delay =  (int(self.speed.get())) / 100
+        self.step_ms = int(self.speed.get()) * SLOWEST_STEP_MS // 100
 
 
     def reset_tape(self):
         """
         Reset the tape to underscore, with position zero set to zero.
         """
-        # Re-initialize the tape_dict
-        self.tape_dict = {}
-
-        # head_position to 0 reset tape_dict to underscore and 0.
-        for i in range((TAPE_LENGTH // 2 * -1), (TAPE_LENGTH // 2 + 1)):
-            self.tape_dict[i] = "_"
-
-        # Set the midpoint of the tape to a value of 0
-        self.tape_dict[0] = "0"
-
-        self.head_position = 0
+        # Abandon any program that is running, and any trace shown.
+        self.stop_cb()
+        self.detector = None
+        self.close_trace()
+
+        # Re-initialize the engine tape. Head position to 0, tape to
+        # underscore and 0.
+        self.engine.reset_tape()
+        self.history.reset()
+        self.update_history_scrubber()
+        self.profile.reset()
+        self.update_heat()
 
         # Update the frames displayed
-        for index, i in enumerate(range(self.head_position - TAPE_RANGE, self.head_position + TAPE_RANGE + 1)):
-            self.tape_frames[index].config(text=str(i))
-            self.tape_labels[index].config(text=self.tape_dict[i])
+        self.move_tape()
 
         # Clear fields.
         self.is_operand_1 = False
@@ -648,16 +868,12 @@ class Turing(ttk.Frame):
         self.label_hex.config(text="")
         self.label_binary.config(text="")
         self.label_decimal.config(text="")
+        self.shown_field = None
 
-        self.f1bl11.configure(text="")  # Counter
-        self.f1bl12.configure(text="")  # Instruction
-        self.f1bl13.configure(text="")  # Head Position
-        self.f1bl14.configure(text="")  # Current State
-        self.f1bl15.configure(text="")  # Next State
-        self.f1bl16.configure(text="")  # Read
-        self.f1bl17.configure(text="")  # Write
-        self.f1bl18.configure(text="")  # Direction
-        self.f1cl21.configure(text="")  # Comment
+        # Counter, Instruction, Head Position, Current State, Next State,
+        # Read, Write, Direction, Comment
+        self.show_info(("",) * len(self.info_labels))
+        self.label_rate.config(text="")
 
 
     def update_hex_bin_dec_display_code_running(self, data_string):
@@ -706,6 +922,9 @@ class Turing(ttk.Frame):
         self.label_decimal.config(text=s)
 
         """
+        # The labels no longer show a tape field.
+        self.shown_field = None
+
         if self.is_execute:
             self.label_hex.config(text="{} {} {} = ".format(self.operand_1, self.operator, self.operand_2))
             # [2:] removes the 0b in the returned binary string
@@ -773,6 +992,18 @@ class Turing(ttk.Frame):
         self.f1c = ttk.Labelframe(f1, text=F1C_TEXT, style="F1C.TFrame", width = 800, height = 200,)
         self.f1c.grid(row=2, column=0,  sticky="nsew")
 
+        # Configure Frame 1D - Trace file scrubber
+        self.style.configure("F1D.TFrame", relief="solid", borderwidth=2, padding=(5,5,5,5),labelmargins=5)
+        self.style.configure("F1D.TFrame.Label", font=('Helvetica', 14), )
+        self.f1d = ttk.Labelframe(f1, text=F1D_TEXT, style="F1D.TFrame", width = 800, height = 200,)
+        self.f1d.grid(row=3, column=0,  sticky="nsew")
+
+        # Configure Frame 1E - Transition heat table, beside 1B to 1D
+        self.style.configure("F1E.TFrame", relief="solid", borderwidth=2, padding=(5,5,5,5),labelmargins=5)
+        self.style.configure("F1E.TFrame.Label", font=('Helvetica', 14), )
+        self.f1e = ttk.Labelframe(f1, text=F1E_TEXT, style="F1E.TFrame", width = 400, height = 200,)
+        self.f1e.grid(row=1, rowspan=3, column=1,  sticky="nsew")
+
         # Configure Frame 2 - Calculator Style Input
         self.style.configure("F2.TFrame", relief="solid", borderwidth=2, padding=(5,5,5,5), labelmargins=5)
         self.style.configure("F2.TFrame.Label", font=('Helvetica', 14),)
@@ -886,6 +1117,52 @@ class Turing(ttk.Frame):
         self.f1cl21 = ttk.Label(self.f1c, text="", borderwidth=2, font=('Helvetica', 12), relief="groove", width = 120, anchor="w")
         self.f1cl21.grid(row=0, column=0, padx=(5, 5), pady=(5, 5))
 
+        # In the order of the values passed to show_info(), with a shadow
+        # copy of the text displayed.
+        self.info_labels = [self.f1bl11, self.f1bl12, self.f1bl13, self.f1bl14,
+                self.f1bl15, self.f1bl16, self.f1bl17, self.f1bl18, self.f1cl21]
+        self.shown_info = [""] * len(self.info_labels)
+
+
+    def setup_trace_frame(self):
+        """
+        Configure contents of Frame 1D - Trace
+        An Open button, a scrubber over the steps of the trace and the step
+        shown.
+        """
+        self.button_trace = ttk.Button(self.f1d, text=F1D_OPEN_TEXT, command=self.open_trace_cb, width = 8,)
+        self.button_trace.grid(row=0, column=0, padx=(5, 5), pady=(5, 5))
+        self.scrubber = ttk.Scale(self.f1d, from_=0, to=0, orient="horizontal", length=800, command=self.scrub_cb)
+        self.scrubber.grid(row=0, column=1, padx=(5, 5), pady=(5, 5))
+        self.label_trace = ttk.Label(self.f1d, text="", borderwidth=2, font=('Helvetica', 12), relief="groove", width = 20, anchor="center")
+        self.label_trace.grid(row=0, column=2, padx=(5, 5), pady=(5, 5))
+
+        # Steps of the current run that can be gone back, or forward, to.
+        self.record_history = tk.BooleanVar(value=False)
+        self.check_history = ttk.Checkbutton(self.f1d, text=F1D_HISTORY_TEXT, variable=self.record_history, command=self.record_history_cb)
+        self.check_history.grid(row=1, column=0, padx=(5, 5), pady=(5, 5))
+        self.history_scrubber = ttk.Scale(self.f1d, from_=0, to=0, orient="horizontal", length=800, command=self.scrub_history_cb)
+        self.history_scrubber.grid(row=1, column=1, padx=(5, 5), pady=(5, 5))
+        self.label_history = ttk.Label(self.f1d, text="", borderwidth=2, font=('Helvetica', 12), relief="groove", width = 20, anchor="center")
+        self.label_history.grid(row=1, column=2, padx=(5, 5), pady=(5, 5))
+
+
+    def setup_heat_frame(self):
+        """
+        Configure contents of Frame 1E - Transition Heat
+        A header of the symbols read. The rows, one per state, are made by
+        build_heat_table() when a program is loaded.
+        """
+        for column, text in enumerate((F1E_STATE_TEXT,) + SYMBOLS + (F1E_STEPS_TEXT,)):
+            label = ttk.Label(self.f1e, text=text, font=('Helvetica', 12), anchor="center")
+            label.grid(row=0, column=column, padx=(2, 2), pady=(2, 2))
+        self.heat_widgets = []
+        self.heat_labels = {}
+        self.shown_heat = {}
+        self.count_steps = tk.BooleanVar(value=False)
+        self.check_count = ttk.Checkbutton(self.f1e, text=F1E_COUNT_TEXT, variable=self.count_steps, command=self.count_steps_cb)
+        self.check_count.grid(row=HEAT_MAX_STATES + 2, column=0, columnspan=5, padx=(2, 2), pady=(5, 5))
+
 
     def setup_calculator_input_frame(self):
         """
@@ -959,10 +1236,10 @@ class Turing(ttk.Frame):
 
             self.button_2a.grid(row=button_list[1], column=button_list[2], sticky="nsew",)
 
-        # Stop and Go are separate as they don't have command callback on click
-        self.button_go = ttk.Button(self.f2b, text=P7_TEXT, style="B2A.TButton",)
+        # Stop, Go and Step control the running program, not the calculator
+        self.button_go = ttk.Button(self.f2b, text=P7_TEXT, style="B2A.TButton", command=self.go_cb, width = 5,)
         self.button_go.grid(row=3, column=8, sticky="nsew",)
-        self.button_stop = ttk.Button(self.f2b, text=P8_TEXT, style="B2A.TButton",)
+        self.button_stop = ttk.Button(self.f2b, text=P8_TEXT, style="B2A.TButton", command=self.stop_cb, width = 5,)
         self.button_stop.grid(row=3, column=9, sticky="nsew",)
 
         # Add the spacers between sections. Columns 4 and 7
@@ -981,7 +1258,20 @@ class Turing(ttk.Frame):
 
         self.speed = ttk.Scale(self.f2b1, from_=0, to=100,  orient="vertical", command=self.slider_changed)
         self.speed.grid(row=0, column=0)
-        # Set the speed to 50 i.e. 50/100. Which is 0.5 + 0.5 = 1 second per state cycle
+        self.button_step = ttk.Button(self.f2b1, text=P9_TEXT, style="B2A.TButton", command=self.step_cb, width = 5,)
+        self.button_step.grid(row=1, column=0, sticky="nsew",)
+        self.button_back = ttk.Button(self.f2b1, text=P10_TEXT, style="B2A.TButton", command=self.step_back_cb, width = 5,)
+        self.button_back.grid(row=2, column=0, sticky="nsew",)
+
+        # Turbo: steps run in the last frame, and the upper bound.
+        self.label_rate_title = ttk.Label(self.f2b1, text=F2B1_RATE_TEXT, font=('Helvetica', 10))
+        self.label_rate_title.grid(row=3, column=0)
+        self.label_rate = ttk.Label(self.f2b1, text="", font=('Helvetica', 10), relief="groove", width = 8, anchor="center")
+        self.label_rate.grid(row=4, column=0)
+        self.max_per_frame = tk.StringVar(value=str(MAX_STEPS_PER_FRAME))
+        self.spin_rate = ttk.Spinbox(self.f2b1, from_=1, to=10**7, increment=100, textvariable=self.max_per_frame, width = 8,)
+        self.spin_rate.grid(row=5, column=0)
+        # Set the speed to 50 i.e. 50/100. Which is 1 second per step
         #print("self.speed.get():", self.speed.get())
         self.speed.set(50)
 
@@ -1023,6 +1313,12 @@ class Turing(ttk.Frame):
         # Add initial data of 0 at position 10
         self.tape_labels[TAPE_RANGE].config(text="0")
 
+        # Shadow copy of the display. Index labels and symbol codes.
+        self.shown_head = 0
+        self.shown_indexes = list(self.frame_list)
+        self.shown_symbols = [0] * len(self.tape_list)
+        self.shown_symbols[TAPE_RANGE] = SYMBOLS.index("0")
+
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+#
+# turing_macro.py
+# Requires: turing_engine.py
+#
+# A macro machine simulator for long running Turing programs, such as busy
+# beavers. The tape is grouped into blocks of k cells and runs of identical
+# blocks are stored once with a repeat count.
+#
+"""
+The head always sits on the leftmost or rightmost cell of the current
+block. A macro step runs the Turing code on the block until the head leaves
+it, or the machine halts. The result is memoized:
+
+    (state, block, side) -> (new state, new block, head offset, steps)
+
+If the machine stops inside the block, with no transition for the state
+and symbol read, the head offset is in the block. If it never leaves the
+block, steps is None.
+
+When a state passes straight through a block and comes out of the far side
+in the same state, every block of a run of identical blocks ahead of it
+gives the same result, so the whole run is crossed in one macro step.
+
+Usage:
+
+    import turing_program
+    from turing_macro import MacroMachine
+
+    machine = MacroMachine(turing_program.function_busy_beaver_4(), 2, "_")
+    machine.run(10**9)
+    print(machine.state, machine.steps, machine.ones, machine.tape_string())
+
+As with the TuringEngine, a run stops with machine.undefined set to
+(state, symbol) when there is no transition. machine.loops is True when the
+machine provably never leaves a block, so never halts.
+
+As with the TuringEngine, position 0 of the tape holds 0 unless initial data
+is supplied. Use "_" for a blank tape.
+"""
+
+from turing_engine import (compile_program, BLANK, ONE, N_SYMBOLS, SYMBOLS,
+        ENCODE, DECODE, MAX_ITERATION)
+
+LEFT, RIGHT = 0, 1
+
+
+class MacroMachine:
+    """
+    Run a program as a macro machine of block_size cell blocks.
+    left and right are stacks of [block, count] with the block next to the
+    head at the end of the list. Beyond the stacks the tape is blank.
+    """
+    def __init__(self, program, block_size=2, initial_data="", state=0):
+        self.program = compile_program(program)
+        self.k = block_size
+        self.blank = bytes(block_size)
+        self.memo = {}
+        self.load(initial_data, state)
+
+
+    def load(self, initial_data="", state=0):
+        """
+        Set the start state and write initial data from position 0. The head
+        is on the leftmost cell of the block holding position 0.
+        """
+        k = self.k
+        data = (initial_data or "0").encode().translate(ENCODE)
+        data += bytes(-len(data) % k)
+        blocks = [data[i:i + k] for i in range(0, len(data), k)]
+
+        self.state_index = self.program.state_index.get(str(state).lower(),
+                self.program.halt)
+        self.block = blocks[0]
+        self.side = LEFT
+        self.left = []
+        self.right = []
+        for block in reversed(blocks[1:]):
+            self.push(self.right, block, 1)
+        self.block_position = 0
+        self.offset = 0
+        self.steps = 0
+        self.macro_steps = 0
+        self.undefined = None
+        self.loops = False
+
+
+    def push(self, stack, block, count):
+        """
+        Push count copies of block on to a stack, merging with the top run.
+        Blank blocks beyond the end of the stack are not stored.
+        """
+        if stack and stack[-1][0] == block:
+            stack[-1][1] += count
+        elif stack or block != self.blank:
+            stack.append([block, count])
+
+
+    def pop(self, stack):
+        """
+        Remove the block next to the head from a stack.
+        """
+        if not stack:
+            return self.blank
+        top = stack[-1]
+        if top[1] == 1:
+            stack.pop()
+        else:
+            top[1] -= 1
+        return top[0]
+
+
+    def block_transition(self, state, block, side):
+        """
+        Run the Turing code on a single block, entered from side, until the
+        head leaves the block, the machine halts or there is no transition.
+        Returns (state, block, head offset, steps). steps is None if the
+        head never leaves the block.
+        """
+        key = (state, block, side)
+        result = self.memo.get(key)
+        if result is not None:
+            return result
+
+        program = self.program
+        actions = program.actions
+        halt = program.halt
+        k = self.k
+        cells = bytearray(block)
+        i = 0 if side == LEFT else k - 1
+        steps = 0
+        # A block has only so many configurations. Beyond that it loops.
+        limit = len(program.states) * k * N_SYMBOLS ** k + 1
+        while 0 <= i < k and state != halt:
+            action = actions[state * N_SYMBOLS + cells[i]]
+            if action is None:
+                # Stuck in the block.
+                break
+            state, cells[i], D = action
+            i += D
+            steps += 1
+            if steps > limit:
+                steps = None
+                break
+
+        result = (state, bytes(cells), i, steps)
+        self.memo[key] = result
+        return result
+
+
+    def run(self, max_steps=MAX_ITERATION):
+        """
+        Run until a halt, no transition, a block the head never leaves, or
+        until another macro step would take the step counter past
+        max_steps. Returns the number of steps executed.
+        """
+        program = self.program
+        halt = program.halt
+        k = self.k
+        start = self.steps
+        limit = start + max_steps
+        while not self.stopped:
+            state, block, i, n = self.block_transition(
+                    self.state_index, self.block, self.side)
+            if n is None:
+                # Loops for ever in the block.
+                self.loops = True
+                break
+            if state == halt or not (i < 0 or i >= k):
+                # Halted inside or on leaving the block, or no transition.
+                if self.steps + n > limit:
+                    break
+                self.block = block
+                self.offset = i
+                self.state_index = state
+                self.steps += n
+                self.macro_steps += 1
+                if state != halt:
+                    self.undefined = (program.states[state], SYMBOLS[block[i]])
+                break
+
+            # Leaving the block. Moving right, the blocks ahead are on the
+            # right stack and the block left behind goes on the left stack.
+            if i >= k:
+                ahead, behind, side, move = self.right, self.left, LEFT, 1
+            else:
+                ahead, behind, side, move = self.left, self.right, RIGHT, -1
+
+            # Passing straight through in the same state. The run of
+            # identical blocks ahead is crossed in the same way.
+            count = 1
+            if state == self.state_index and side == self.side:
+                if ahead and ahead[-1][0] == self.block:
+                    count += ahead[-1][1]
+                elif not ahead and self.block == self.blank:
+                    # Blank for ever. Cross as many as the budget allows.
+                    count = max((limit - self.steps) // n, 1)
+
+            if self.steps + n > limit:
+                break
+            count = min(count, (limit - self.steps) // n)
+            if count > 1 and ahead and ahead[-1][0] == self.block:
+                # Remove the crossed blocks, except the current one.
+                run = ahead[-1]
+                run[1] -= count - 1
+                if run[1] == 0:
+                    ahead.pop()
+
+            self.push(behind, block, count)
+            self.steps += n * count
+            self.macro_steps += 1
+            self.block_position += move * count
+            self.state_index = state
+            self.side = side
+            self.block = self.pop(ahead)
+            self.offset = 0 if side == LEFT else k - 1
+
+        return self.steps - start
+
+
+    @property
+    def state(self):
+        """
+        Name of the current state. E.g. "0" or "h"
+        """
+        return self.program.states[self.state_index]
+
+
+    @property
+    def halted(self):
+        return self.state_index == self.program.halt
+
+
+    @property
+    def stopped(self):
+        """
+        True if the machine has halted, has no transition or loops.
+        """
+        return self.halted or self.undefined is not None or self.loops
+
+
+    @property
+    def head(self):
+        """
+        Position of the head on the tape.
+        """
+        return self.block_position * self.k + self.offset
+
+
+    @property
+    def ones(self):
+        """
+        Count of ones on the tape, without expanding the runs.
+        """
+        total = self.block.count(ONE)
+        for stack in (self.left, self.right):
+            for block, count in stack:
+                total += block.count(ONE) * count
+        return total
+
+
+    def tape_string(self):
+        """
+        Return the tape contents, ignoring leading and trailing underscores.
+        Runs are expanded, so this may be large.
+        """
+        cells = b"".join(block * count for block, count in self.left)
+        cells += self.block
+        cells += b"".join(block * count for block, count in reversed(self.right))
+        return cells.translate(DECODE).decode().strip(BLANK)
+
+
+if __name__ == "__main__":
+
+    # For testing...
+    import turing_program
+
+    for function in (turing_program.function_busy_beaver_3,
+            turing_program.function_busy_beaver_4):
+        machine = MacroMachine(function(), 2)
+        machine.run(10**9)
+        print(function.__name__, machine.state, machine.steps,
+                machine.ones, machine.tape_string())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+#
+# turing_registry.py
+# Requires: turing_program.py, turing_engine.py, turing_loader.py
+#
+# Find Turing programs by name. The function_* builders in turing_program.py
+# are found by name, and each program is built and compiled the first time it
+# is asked for, and then kept. Nothing here imports tkinter, so batch workers
+# and command line tools start without the cost of the GUI.
+#
+"""
+A name is a calculator button label (Inc, Dec, +, BB3...), the name of a
+turing_program.py function without the "function_" prefix (addition,
+dec1...), or the path of a program file read by turing_loader.py.
+
+Usage:
+
+    from turing_registry import get_program, arity
+    engine = TuringEngine(get_program("+"), "11_10")
+    arity("+")      # 2, the number of operands
+    names()         # ['addition', 'busy_beaver_3', ...]
+"""
+import sys
+import os
+
+import turing_program
+from turing_engine import compile_program
+
+PREFIX = "function_"
+
+# Calculator button labels and the turing_program.py function they run.
+OPERATORS = {
+    "Inc": "inc", "Dec": "dec", "P3": "p3", "P4": "p4",
+    "+": "addition", "-": "subtraction", "*": "multiplication",
+    "//": "division", "P5": "p5", "P6": "p6",
+    "BB3": "busy_beaver_3", "BB4": "busy_beaver_4",
+}
+
+# Number of operands taken by each program. Others take none.
+ARITY = {
+    "inc": 1, "dec": 1, "dec1": 1, "p3": 1, "p4": 1,
+    "addition": 2, "subtraction": 2, "multiplication": 2, "division": 2,
+    "p5": 2, "p6": 2,
+}
+
+# Programs compiled in this process, by name.
+_compiled = {}
+
+
+def names():
+    """
+    Names of the function_* builders in turing_program.py.
+    """
+    return sorted(name[len(PREFIX):] for name in dir(turing_program)
+            if name.startswith(PREFIX) and callable(getattr(turing_program, name)))
+
+
+def program_name(name):
+    """
+    Return the turing_program.py function name, without the "function_"
+    prefix, for a calculator label or function name. A program file's path
+    is returned unchanged.
+    Raises ValueError if there is no such program.
+    """
+    name = OPERATORS.get(name, name)
+    if hasattr(turing_program, PREFIX + name) or os.path.isfile(name):
+        return name
+    raise ValueError("Unknown program: {}".format(name))
+
+
+def arity(name):
+    """
+    Number of operands the program takes, 0, 1 or 2.
+    """
+    return ARITY.get(program_name(name), 0)
+
+
+def get_program(name):
+    """
+    Return the CompiledProgram for a name. It is built on first use only.
+    """
+    name = program_name(name)
+    program = _compiled.get(name)
+    if program is None:
+        if hasattr(turing_program, PREFIX + name):
+            program = compile_program(getattr(turing_program, PREFIX + name)())
+        else:
+            from turing_loader import load_program
+            program = load_program(name)
+        _compiled[name] = program
+    return program
+
+
+if __name__ == "__main__":
+    sys.exit("\nNote: {} is a python library, and not a stand-alone program."
+            .format(sys.argv[0]))
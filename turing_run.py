@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+#
+# turing_run.py
+# Requires: turing_engine.py, turing_registry.py, turing_snapshot.py
+#
+# Run a Turing program from the command line, without the GUI, and print the
+# outcome as JSON. The exit status tells a script or cron job whether the
+# program halted, provably loops or ran out of budget.
+#
+"""
+Usage:
+
+    python3 -m turing_run + --data 11_10
+    python3 -m turing_run busy_beaver_4 --data _ --max-steps 1000000
+    python3 -m turing_run program.tm --data 101 --timeout 60 --no-loops
+    python3 -m turing_run inc --data 1 --max-steps 100000000 \
+            --checkpoint inc.snap --resume
+
+The program is a calculator label, a turing_program.py function name or a
+program file, see turing_registry.py. The JSON printed is e.g.
+
+    {"program": "addition", "status": "halts", "state": "h", "steps": 32,
+     "head": 0, "tape": "101", "ones": 2,
+     "fields": [{"binary": "101", "decimal": 5}], "seconds": 0.0001,
+     "steps_per_second": 320000, "peak_memory_kb": 10240, ...}
+
+Exit status:
+
+    0   halts
+    1   error, e.g. an unknown program
+    2   bad arguments
+    3   loops, the configuration provably repeats
+    4   timeout, the step or time budget ran out
+    5   undefined, no transition for the state and symbol read
+
+The program is checked with validate_program() before it is run. Undefined
+transitions, unreachable states and states that can't reach halt are
+warned of on stderr, but the program is still run.
+
+--profile adds the steps taken by each transition and state, and in each
+head position, as "profile". It slows the run.
+
+Loop checking steps one at a time. --no-loops runs the faster loop of
+TuringEngine.run(), and a program that never halts ends with timeout.
+"""
+import sys
+import os
+import json
+import time
+import argparse
+
+try:
+    import resource
+except ImportError:
+    # Windows. Peak memory is not reported.
+    resource = None
+
+from turing_engine import (TuringEngine, LoopDetector, Profile, HALTS, LOOPS,
+        UNDEFINED, BUDGET, MAX_ITERATION, STATUS_NAME, validate_program)
+from turing_registry import get_program, program_name
+from turing_snapshot import (load_snapshot, save_snapshot,
+        CHECKPOINT_STEPS)
+
+EXIT_STATUS = {HALTS: 0, LOOPS: 3, BUDGET: 4, UNDEFINED: 5}
+EXIT_ERROR = 1
+
+# Longest field given a decimal value. Longer ones are left as binary.
+MAX_DECIMAL_BITS = 1024
+
+# Steps between looks at the clock and the checkpoint.
+CHUNK_STEPS = 10000
+
+def peak_memory_kb():
+    """
+    Peak resident memory of this process in kB, or None if it is unknown.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kB elsewhere.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def decode_fields(engine):
+    """
+    The blocks of data on the tape, as binary strings and their values.
+    """
+    return [{"binary": field, "decimal": int(field, 2)
+            if len(field) <= MAX_DECIMAL_BITS else None}
+            for field in engine.fields()]
+
+
+def run(engine, max_steps=MAX_ITERATION, timeout=None, loops=True,
+        checkpoint=None, every=CHECKPOINT_STEPS):
+    """
+    Run the engine until it stops, provably loops, has executed up to
+    max_steps on its counter or timeout seconds have passed.
+    With checkpoint, a snapshot is saved to that file every so many steps
+    and when the run ends.
+    Returns the Verdict.
+    """
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    detector = LoopDetector(engine) if loops else None
+    saved = engine.counter
+    while not engine.stopped and engine.counter < max_steps:
+        chunk = min(CHUNK_STEPS, max_steps - engine.counter)
+        if detector is None:
+            engine.run(chunk)
+        else:
+            for _ in range(chunk):
+                verdict = detector.step()
+                if verdict is not None:
+                    if checkpoint:
+                        save_snapshot(engine, checkpoint)
+                    return verdict
+        if checkpoint and engine.counter - saved >= every:
+            save_snapshot(engine, checkpoint)
+            saved = engine.counter
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+    if checkpoint:
+        save_snapshot(engine, checkpoint)
+    return engine.verdict()
+
+
+def profile_record(profile):
+    """
+    The counts of a Profile, ready for JSON.
+    """
+    return {
+        "transitions": [[p, X, count] for (p, X), count
+                in profile.transitions.most_common()],
+        "states": dict(profile.states().most_common()),
+        "heads": {str(head): count for head, count
+                in sorted(profile.heads.items())},
+    }
+
+
+def report(name, engine, verdict, steps, seconds, profile=None):
+    """
+    Return the outcome of a run as a dictionary, ready for JSON.
+    """
+    record = {
+        "program": name,
+        "status": STATUS_NAME[verdict.kind],
+        "state": engine.state,
+        "steps": engine.counter,
+        "head": engine.head,
+        "tape": engine.tape_string(),
+        "ones": engine.tape.ones,
+        "fields": decode_fields(engine),
+        "seconds": round(seconds, 6),
+        "steps_per_second": round(steps / seconds) if seconds else None,
+        "peak_memory_kb": peak_memory_kb(),
+    }
+    if verdict.kind == LOOPS:
+        record.update({"period": verdict.period,
+                "preperiod": verdict.preperiod, "shift": verdict.shift})
+    if engine.undefined is not None:
+        record["undefined"] = list(engine.undefined)
+    if profile is not None:
+        record["profile"] = profile_record(profile)
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+            description="Run a Turing program and print the outcome as JSON.")
+    parser.add_argument("program",
+            help="E.g. +, Dec, addition, busy_beaver_4 or a program file")
+    parser.add_argument("--data", default="",
+            help="Initial tape data. E.g. 11_10 or _ for a blank tape")
+    parser.add_argument("--state", default="0", help="Start state (default 0)")
+    parser.add_argument("--max-steps", type=int, default=MAX_ITERATION,
+            help="Total step budget (default {})".format(MAX_ITERATION))
+    parser.add_argument("--timeout", type=float, default=None,
+            help="Time budget in seconds")
+    parser.add_argument("--no-loops", action="store_true",
+            help="Don't check for loops. Faster, but a loop ends as timeout")
+    parser.add_argument("--checkpoint", default=None,
+            help="Snapshot file, written every --every steps and at the end")
+    parser.add_argument("--every", type=int, default=CHECKPOINT_STEPS,
+            help="Steps between checkpoints (default {})"
+            .format(CHECKPOINT_STEPS))
+    parser.add_argument("--resume", action="store_true",
+            help="Carry on from the checkpoint file, if there is one")
+    parser.add_argument("--profile", action="store_true",
+            help="Count the steps by transition, state and head position")
+    parser.add_argument("--indent", type=int, default=None,
+            help="Indent the JSON output")
+    args = parser.parse_args(argv)
+
+    try:
+        name = program_name(args.program)
+        program = get_program(name)
+        if args.resume and args.checkpoint and os.path.exists(args.checkpoint):
+            engine = load_snapshot(args.checkpoint, program)
+            data = None     # Any symbol may be on the resumed tape
+        else:
+            engine = TuringEngine(program, args.data, args.state)
+            data = args.data
+    except (ValueError, OSError) as e:
+        print("Error: {}".format(e), file=sys.stderr)
+        return EXIT_ERROR
+
+    # A program that fails validation is still run. It may never meet the
+    # transitions that are missing.
+    validation = validate_program(engine.program, args.state, data)
+    if not validation.ok:
+        for line in str(validation).splitlines():
+            print("Warning: {}".format(line), file=sys.stderr)
+
+    profile = None
+    if args.profile:
+        profile = Profile(engine)
+        profile.attach()
+
+    counter = engine.counter
+    start = time.perf_counter()
+    verdict = run(engine, args.max_steps, args.timeout, not args.no_loops,
+            args.checkpoint, args.every)
+    seconds = time.perf_counter() - start
+
+    print(json.dumps(report(name, engine, verdict, engine.counter - counter,
+            seconds, profile), indent=args.indent))
+    return EXIT_STATUS[verdict.kind]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+#
+# turing_scaling.py
+# Requires: turing_engine.py, turing_registry.py
+#
+# Measure how the step count and the tape cells used by a program grow with
+# the bit length of its operands, fit the growth to the usual complexity
+# classes and show it as a table and a plot. Wall-clock speed is measured by
+# turing_bench.py. This counts steps, so it gives the same answer on any
+# computer.
+#
+"""
+Usage:
+
+    python3 turing_scaling.py addition
+    python3 turing_scaling.py dec --max-bits 20 --samples 5
+    python3 turing_scaling.py + --png addition.png     # Requires matplotlib
+
+For each bit length n from 1 to max-bits the program is run on n-bit
+operands: all ones, a one followed by zeros, and some random values, the
+same ones on every run. The worst case of each is kept. A binary program
+is given the same value for both operands.
+
+Cells are the cells visited by the head, from the leftmost to the
+rightmost, including those that were never written.
+
+Growth models are fitted by least squares:
+
+    constant     a
+    linear       a n + b
+    n log n      a n log2 n + b
+    quadratic    a n^2 + b
+    cubic        a n^3 + b
+    exponential  a 2^(k n), fitted to log2 of the counts
+
+The model with the smallest root mean square relative error is reported.
+"""
+import sys
+import math
+import random
+import argparse
+
+from turing_engine import TuringEngine, HALT
+from turing_registry import get_program, program_name, arity
+
+MAX_BITS = 12
+MAX_STEPS = 10**7
+SAMPLES = 3
+SEED = 1
+
+# Growth models. Each is a function of n, fitted as a f(n) + b.
+MODELS = (
+    ("constant", lambda n: 0.0),
+    ("linear", lambda n: float(n)),
+    ("n log n", lambda n: n * math.log2(n) if n > 1 else 0.0),
+    ("quadratic", lambda n: float(n * n)),
+    ("cubic", lambda n: float(n ** 3)),
+)
+EXPONENTIAL = "exponential"
+
+PLOT_WIDTH = 50
+
+
+def operand_values(bits, samples, seed=SEED):
+    """
+    Operand values of bits length: all ones, a one followed by zeros, and
+    samples random values.
+    """
+    rng = random.Random(seed * 1000 + bits)
+    values = {(1 << bits) - 1, 1 << (bits - 1)}
+    for _ in range(samples):
+        values.add(rng.randrange(1 << (bits - 1), 1 << bits))
+    return sorted(values)
+
+
+def measure(program, data, max_steps=MAX_STEPS):
+    """
+    Run a program on data. Returns (steps, cells visited, halted).
+    """
+    engine = TuringEngine(program, data)
+    reach = [engine.head, engine.head]
+
+    def visit(engine):
+        head = engine.head
+        if head < reach[0]:
+            reach[0] = head
+        elif head > reach[1]:
+            reach[1] = head
+        return False
+
+    steps = engine.run_until(visit, max_steps)
+    return steps, reach[1] - reach[0] + 1, engine.state == HALT
+
+
+def scaling(name, max_bits=MAX_BITS, samples=SAMPLES, max_steps=MAX_STEPS):
+    """
+    Measure a program on operands of 1 to max_bits bits.
+    Returns a list of (bits, worst steps, worst cells). It stops early at a
+    length where a run does not halt within max_steps.
+    """
+    operands = arity(name)
+    if operands == 0:
+        raise ValueError("{} takes no operands".format(name))
+    program = get_program(name)
+    rows = []
+    for bits in range(1, max_bits + 1):
+        worst_steps = worst_cells = 0
+        for value in operand_values(bits, samples):
+            data = "_".join([bin(value)[2:]] * operands)
+            steps, cells, halted = measure(program, data, max_steps)
+            if not halted:
+                print("{} bits: {} did not halt within {} steps. Stopped."
+                        .format(bits, data, max_steps))
+                return rows
+            worst_steps = max(worst_steps, steps)
+            worst_cells = max(worst_cells, cells)
+        rows.append((bits, worst_steps, worst_cells))
+    return rows
+
+
+def least_squares(xs, ys):
+    """
+    Return (a, b) of the line y = a x + b that best fits the points.
+    """
+    count = len(xs)
+    mean_x = sum(xs) / count
+    mean_y = sum(ys) / count
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    if sxx == 0:
+        return 0.0, mean_y
+    a = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sxx
+    return a, mean_y - a * mean_x
+
+
+def relative_error(predicted, ys):
+    """
+    Root mean square of the errors relative to the measured values.
+    """
+    return math.sqrt(sum(((p - y) / max(y, 1)) ** 2
+            for p, y in zip(predicted, ys))
+            / len(ys))
+
+
+def fit_growth(ns, ys):
+    """
+    Fit each model to the counts ys at lengths ns.
+    Returns a list of (error, model name, formula), best first.
+    """
+    fits = []
+    for model, f in MODELS:
+        xs = [f(n) for n in ns]
+        a, b = least_squares(xs, ys)
+        error = relative_error([a * x + b for x in xs], ys)
+        if model == "constant":
+            formula = "{:.4g}".format(b)
+        else:
+            formula = "{:.4g} {} {:+.4g}".format(a, {"linear": "n",
+                    "n log n": "n log n", "quadratic": "n^2",
+                    "cubic": "n^3"}[model], b)
+        fits.append((error, model, formula))
+
+    k, log_a = least_squares(ns, [math.log2(max(y, 1)) for y in ys])
+    error = relative_error([2 ** (log_a + k * n) for n in ns], ys)
+    fits.append((error, EXPONENTIAL,
+            "{:.4g} * 2^({:.4g} n)".format(2 ** log_a, k)))
+    # Ties go to the simpler model, the first in MODELS.
+    order = [model for model, _ in MODELS] + [EXPONENTIAL]
+    fits.sort(key=lambda fit: (round(fit[0], 9), order.index(fit[1])))
+    return fits
+
+
+def print_table(rows):
+    print("{:>5} {:>14} {:>10}".format("Bits", "Steps", "Cells"))
+    for bits, steps, cells in rows:
+        print("{:>5} {:>14,} {:>10,}".format(bits, steps, cells))
+
+
+def print_plot(rows, column=1, title="Steps"):
+    """
+    Plot a column of rows as horizontal bars, on a log scale.
+    """
+    top = math.log2(max(row[column] for row in rows) + 1) or 1
+    print("\n{}, log scale".format(title))
+    for row in rows:
+        width = round(PLOT_WIDTH * math.log2(row[column] + 1) / top)
+        print("{:>5} |{} {:,}".format(row[0], "#" * width, row[column]))
+
+
+def save_png(rows, name, path):
+    """
+    Plot steps and cells against bits to a PNG file with matplotlib.
+    """
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        sys.exit("--png requires matplotlib. E.g. pip install matplotlib")
+    bits = [row[0] for row in rows]
+    plt.semilogy(bits, [row[1] for row in rows], "o-", label="Steps")
+    plt.semilogy(bits, [row[2] for row in rows], "s-", label="Cells")
+    plt.xlabel("Operand bits")
+    plt.title(name)
+    plt.legend()
+    plt.grid(True, which="both", alpha=0.3)
+    plt.savefig(path)
+    print("Plot written to {}".format(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+            description="Measure how a Turing program's steps and cells "
+            "grow with the bit length of its operands.")
+    parser.add_argument("program", help="E.g. addition, +, dec, inc")
+    parser.add_argument("--max-bits", type=int, default=MAX_BITS,
+            help="Longest operand in bits (default {})".format(MAX_BITS))
+    parser.add_argument("--samples", type=int, default=SAMPLES,
+            help="Random operands per length (default {})".format(SAMPLES))
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS,
+            help="Step budget per run (default {})".format(MAX_STEPS))
+    parser.add_argument("--png", default=None,
+            help="Also plot to this PNG file. Requires matplotlib")
+    args = parser.parse_args(argv)
+
+    try:
+        name = program_name(args.program)
+        rows = scaling(name, args.max_bits, args.samples, args.max_steps)
+    except ValueError as e:
+        sys.exit(str(e))
+    if not rows:
+        sys.exit("No operand length halted within {} steps."
+                .format(args.max_steps))
+
+    print("{}, worst case of {} operands per length".format(name,
+            args.samples + 2))
+    print_table(rows)
+    print_plot(rows)
+    if len(rows) < 3:
+        print("\nToo few lengths to fit a growth model.")
+    else:
+        ns = [row[0] for row in rows]
+        for column, title in ((1, "Steps"), (2, "Cells")):
+            fits = fit_growth(ns, [row[column] for row in rows])
+            error, model, formula = fits[0]
+            print("\n{} grow as {}: {} (error {:.1%})".format(title, model,
+                    formula, error))
+            print("  Others: " + ", ".join("{} {:.1%}".format(m, e)
+                    for e, m, _ in fits[1:]))
+    if args.png:
+        save_png(rows, name, args.png)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+#
+# turing_snapshot.py
+# Requires: turing_engine.py, turing_registry.py
+#
+# Save the configuration of a running TuringEngine to a compact snapshot,
+# checkpoint long runs to a file at intervals, and resume a run from its
+# last checkpoint. Keep a history of recent steps in memory, so that a run
+# can be stepped backwards.
+#
+"""
+A snapshot is:
+
+    header  MAGIC, program hash, counter, head, state index, left, cells
+    tape    the cells from left, packed four 2-bit symbol codes to a byte
+
+The program hash is a SHA-256 of the compiled tables, so a snapshot is only
+resumed with the program it was taken from. Comments don't change it.
+
+Usage:
+
+    python3 turing_snapshot.py busy_beaver_4 --data _ --checkpoint bb4.snap
+    python3 turing_snapshot.py inc --data 1 --max-steps 10000000 \
+            --checkpoint inc.snap --every 1000000 --resume
+
+    from turing_snapshot import save_snapshot, load_snapshot
+    save_snapshot(engine, "run.snap")
+    engine = load_snapshot("run.snap", program)
+
+    history = History(engine)
+    history.attach()
+    engine.run(1000)
+    history.step_back()
+    history.goto(250)
+"""
+import sys
+import os
+import time
+import struct
+import hashlib
+import argparse
+from collections import deque
+
+from turing_engine import (TuringEngine, Tape, compile_program, SYMBOL_CODE,
+        MAX_ITERATION)
+
+MAGIC = b"TURSNAP1"
+HEADER = struct.Struct("<8s32sqqIqQ")
+
+# Steps between checkpoints.
+CHECKPOINT_STEPS = 10**7
+
+# Steps kept in a History, and steps between its in-memory snapshots.
+HISTORY_SIZE = 100000
+HISTORY_SNAPSHOT_STEPS = 1000
+
+# Cells per packed byte, and tables to take out each 2-bit code.
+PACK = 4
+SHIFTS = [bytes((code << 2 * k) & 0xff for code in range(256))
+        for k in range(PACK)]
+UNPACK = [bytes((byte >> 2 * k) & 3 for byte in range(256))
+        for k in range(PACK)]
+
+
+def program_hash(program):
+    """
+    SHA-256 of the compiled tables of a program, a trf dictionary or a
+    CompiledProgram.
+    """
+    program = compile_program(program)
+    digest = hashlib.sha256()
+    digest.update("\0".join(program.states).encode())
+    for table in (program.next_state, program.write, program.delta):
+        digest.update(table.tobytes())
+    return digest.digest()
+
+
+def pack(cells):
+    """
+    Pack symbol codes, 0 to 3, four to a byte. The first cell is in the low
+    bits.
+    """
+    cells = bytes(cells) + bytes(-len(cells) % PACK)
+    size = len(cells) // PACK
+    total = 0
+    # The codes in each slice fill different bits, so adding the slices as
+    # big integers packs every byte at once.
+    for k in range(PACK):
+        total |= int.from_bytes(cells[k::PACK].translate(SHIFTS[k]), "big")
+    return total.to_bytes(size, "big")
+
+
+def unpack(packed, count):
+    """
+    Return the first count symbol codes of packed, as a bytearray.
+    """
+    cells = bytearray(len(packed) * PACK)
+    for k in range(PACK):
+        cells[k::PACK] = packed.translate(UNPACK[k])
+    del cells[count:]
+    return cells
+
+
+def snapshot(engine):
+    """
+    Return the configuration of the engine as bytes.
+    """
+    left, cells = engine.tape.contents() or (0, b"")
+    return HEADER.pack(MAGIC, program_hash(engine.program), engine.counter,
+            engine.head, engine.state_index, left, len(cells)) + pack(cells)
+
+
+def restore(data, program, engine=None):
+    """
+    Load the program, and the configuration in data, into engine, or a new
+    TuringEngine. Returns the engine.
+    Raises ValueError if data is not a snapshot of the program.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Not a snapshot")
+    magic, digest, counter, head, state, left, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a snapshot")
+    program = compile_program(program)
+    if digest != program_hash(program):
+        raise ValueError("Snapshot is of a different program")
+
+    if engine is None:
+        engine = TuringEngine()
+    engine.load(program, None)
+    engine.tape = Tape()
+    engine.tape.restore(left, unpack(data[HEADER.size:], count))
+    engine.state_index = state
+    engine.head = head
+    engine.counter = counter
+    return engine
+
+
+def save_snapshot(engine, path):
+    """
+    Write a snapshot of the engine to path. The file is replaced in one
+    step, so a crash leaves either the old snapshot or the new one.
+    """
+    temp = path + ".tmp"
+    with open(temp, "wb") as f:
+        f.write(snapshot(engine))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+
+
+def load_snapshot(path, program, engine=None):
+    """
+    Read the snapshot at path. See restore().
+    """
+    with open(path, "rb") as f:
+        return restore(f.read(), program, engine)
+
+
+def run_with_checkpoints(engine, max_steps=MAX_ITERATION, path=None,
+        every=CHECKPOINT_STEPS):
+    """
+    Run the engine like TuringEngine.run(), saving a snapshot to path every
+    so many steps and when the run ends. max_steps counts from the engine's
+    counter, so a resumed run carries on to the same total.
+    Returns the number of steps executed.
+    """
+    steps = 0
+    while not engine.stopped and engine.counter < max_steps:
+        steps += engine.run(min(every, max_steps - engine.counter))
+        if path:
+            save_snapshot(engine, path)
+    return steps
+
+
+class History:
+    """
+    An undo log of the steps of an engine, so that it can be stepped back.
+
+    Each step appends (cell, old symbol code, old state index) to a ring
+    buffer of size entries. The head was on the cell before the step. Every
+    snapshot_every steps a copy of the configuration is kept as well, so
+    going back a long way is a snapshot restore and a short re-run rather
+    than a long undo. Memory is bounded by size.
+    """
+    def __init__(self, engine, size=HISTORY_SIZE,
+            snapshot_every=HISTORY_SNAPSHOT_STEPS):
+        self.engine = engine
+        self.snapshot_every = snapshot_every
+        self.log = deque(maxlen=size)
+        # Enough snapshots to cover the log, plus the one before it.
+        self.snapshots = deque(maxlen=-(-size // snapshot_every) + 1)
+        self.reset()
+
+
+    def attach(self):
+        """
+        Subscribe to the engine's steps.
+        """
+        self.engine.subscribe(self.record)
+
+
+    def detach(self):
+        self.engine.unsubscribe(self.record)
+
+
+    def reset(self):
+        """
+        Forget everything. The history starts from the engine as it is.
+        """
+        self.log.clear()
+        self.snapshots.clear()
+        self.take_snapshot()
+        self.latest = self.engine.counter
+
+
+    def take_snapshot(self):
+        engine = self.engine
+        self.snapshots.append((engine.counter, engine.state_index,
+                engine.head, engine.tape.copy()))
+
+
+    def record(self, engine):
+        """
+        Engine observer. Log the step in engine.last.
+        """
+        counter, head, p, X, q, Y, D = engine.last
+        self.log.append((head, SYMBOL_CODE[X], engine.program.state_index[p]))
+        if engine.counter % self.snapshot_every == 0:
+            self.take_snapshot()
+        if engine.counter > self.latest:
+            self.latest = engine.counter
+
+
+    @property
+    def earliest(self):
+        """
+        The earliest counter value that can be gone back to.
+        """
+        earliest = self.engine.counter - len(self.log)
+        if self.snapshots:
+            earliest = min(earliest, self.snapshots[0][0])
+        return earliest
+
+
+    def step_back(self):
+        """
+        Undo the last step. Returns False if it is not in the history.
+        """
+        if not self.log:
+            return self.goto(self.engine.counter - 1)
+        engine = self.engine
+        cell, code, state = self.log.pop()
+        engine.tape[cell] = code
+        engine.head = cell
+        engine.state_index = state
+        engine.counter -= 1
+        engine.undefined = None
+        engine.last = None
+        self.drop_snapshots()
+        return True
+
+
+    def drop_snapshots(self):
+        """
+        Drop snapshots later than the engine. They are taken again if the
+        steps are executed again.
+        """
+        while self.snapshots and self.snapshots[-1][0] > self.engine.counter:
+            self.snapshots.pop()
+
+
+    def goto(self, target):
+        """
+        Move the engine to counter value target, backwards through the
+        history or forwards by executing steps. Returns False if target is
+        earlier than the history.
+        """
+        engine = self.engine
+        if target < self.earliest:
+            return False
+        if target >= engine.counter:
+            self.forward(target - engine.counter)
+            return True
+
+        back = engine.counter - target
+        if back <= len(self.log) and back <= self.snapshot_every:
+            for _ in range(back):
+                self.step_back()
+            return True
+
+        # Restore the last snapshot at or before target and run on from it.
+        for counter, state, head, tape in reversed(self.snapshots):
+            if counter <= target:
+                break
+        else:
+            # Every snapshot is later than target. As target is not earlier
+            # than the history, the log reaches back to it.
+            for _ in range(back):
+                self.step_back()
+            return True
+        drop = engine.counter - counter
+        if drop >= len(self.log):
+            self.log.clear()
+        else:
+            for _ in range(drop):
+                self.log.pop()
+        engine.tape = tape.copy()
+        engine.head = head
+        engine.state_index = state
+        engine.counter = counter
+        engine.undefined = None
+        engine.last = None
+        self.drop_snapshots()
+        self.forward(target - counter)
+        return True
+
+
+    def forward(self, steps):
+        """
+        Execute steps, with only the history observing them.
+        """
+        engine = self.engine
+        observers = engine.observers
+        engine.observers = [self.record]
+        try:
+            engine.run(steps)
+        finally:
+            engine.observers = observers
+
+
+def main(argv=None):
+    from turing_registry import get_program
+
+    parser = argparse.ArgumentParser(
+            description="Run a Turing program with checkpoints.")
+    parser.add_argument("program", help="E.g. busy_beaver_4, inc, +")
+    parser.add_argument("--data", default="",
+            help="Initial tape data. E.g. 11_10 or _ for a blank tape")
+    parser.add_argument("--max-steps", type=int, default=MAX_ITERATION,
+            help="Total step budget (default {})".format(MAX_ITERATION))
+    parser.add_argument("--checkpoint", default=None,
+            help="Snapshot file, written every --every steps")
+    parser.add_argument("--every", type=int, default=CHECKPOINT_STEPS,
+            help="Steps between checkpoints (default {})"
+            .format(CHECKPOINT_STEPS))
+    parser.add_argument("--resume", action="store_true",
+            help="Carry on from the checkpoint file, if there is one")
+    args = parser.parse_args(argv)
+
+    program = get_program(args.program)
+    if args.resume and args.checkpoint and os.path.exists(args.checkpoint):
+        engine = load_snapshot(args.checkpoint, program)
+        print("Resumed from {} at step {}".format(args.checkpoint,
+                engine.counter))
+    else:
+        engine = TuringEngine(program, args.data)
+
+    start = time.perf_counter()
+    steps = run_with_checkpoints(engine, args.max_steps, args.checkpoint,
+            args.every)
+    seconds = time.perf_counter() - start
+    print("State: {}, steps: {}, ones: {}, {:.2f} s".format(engine.state,
+            engine.counter, engine.tape.ones, seconds))
+    if steps and seconds:
+        print("{:.0f} steps/s".format(steps / seconds))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+#
+# turing_trace.py
+# Requires: turing_engine.py
+#
+# Trace sinks. A sink receives the start of a run, every step and the end of
+# the run from a TuringEngine, and writes them somewhere: as human readable
+# text, as JSON lines or as a packed binary trace file that TraceReader can
+# seek in.
+#
+"""
+Levels:
+
+    OFF     - nothing is written
+    SUMMARY - the start and the end of each run, and notes, e.g. warnings
+    STEP    - every step as well
+
+Only a sink at the STEP level subscribes to the engine. At OFF and SUMMARY
+the engine has no observers, so TuringEngine.run() keeps to its fast loop
+and tracing costs nothing per step.
+
+Usage:
+
+    import turing_program
+    from turing_engine import TuringEngine
+    from turing_trace import TextSink, JsonLinesSink, STEP
+
+    engine = TuringEngine(turing_program.function_addition(), "11_10")
+    sink = TextSink(level=STEP)
+    sink.attach(engine)
+    sink.start(engine)
+    sink.finish(engine, engine.decide())
+    sink.detach(engine)
+
+    with open("trace.jsonl", "w") as f:
+        sink = JsonLinesSink(f, STEP)
+        ...
+
+Binary traces:
+
+    sink = BinaryTraceSink("run.trace")
+    sink.attach(engine)
+    sink.start(engine)
+    engine.run(10**6)
+    sink.finish(engine)     # Writes the index and closes the file
+
+    reader = TraceReader("run.trace")
+    state, head, tape = reader.configuration(500000)
+
+The file holds a header, then blocks of a keyframe, the full configuration,
+followed by the packed records of the next KEYFRAME_INTERVAL steps. An
+index of the keyframes and a tail are written when the run finishes:
+
+    header    MAGIC, VERSION, length of the JSON metadata, metadata
+    keyframe  counter, head, state index, left, cell count, then the cells
+    record    counter, state index, head, read, write, move
+    index     (counter, file offset) for each keyframe
+    tail      index offset, keyframe count, final counter, state, head, MAGIC
+
+Records are a fixed size, so a step is found by a binary search of the
+index, O(log n), and at most KEYFRAME_INTERVAL records are replayed on to
+the keyframe tape.
+"""
+import sys
+import json
+import mmap
+import struct
+from bisect import bisect_right
+
+from turing_engine import Tape, SYMBOL_CODE, SYMBOLS, MOVES, MOVE_NAME
+
+OFF = 0
+SUMMARY = 1
+STEP = 2
+
+LEVELS = {"off": OFF, "summary": SUMMARY, "step": STEP}
+
+# Binary trace file layout. Little endian.
+MAGIC = b"TURTRACE"
+VERSION = 1
+HEADER = struct.Struct("<8sHI")
+KEYFRAME = struct.Struct("<qqIqI")
+RECORD = struct.Struct("<qIqBBb")
+INDEX = struct.Struct("<qQ")
+TAIL = struct.Struct("<QQqIq8s")
+KEYFRAME_INTERVAL = 1024
+
+
+class TraceSink:
+    """
+    Base class of sinks. Subclasses write the events, with write_start(),
+    write_step(), write_finish() and write_note(). The events are filtered by
+    level here.
+    """
+    def __init__(self, stream=None, level=SUMMARY):
+        self.stream = stream if stream is not None else sys.stdout
+        self.level = LEVELS.get(level, level)
+        self.attached = None
+
+
+    def attach(self, engine):
+        """
+        Subscribe to the engine's steps, if the level is STEP.
+        """
+        if self.level >= STEP and self.attached is None:
+            engine.subscribe(self.step)
+            self.attached = engine
+
+
+    def detach(self, engine):
+        """
+        Stop receiving the engine's steps.
+        """
+        if self.attached is engine:
+            engine.unsubscribe(self.step)
+            self.attached = None
+
+
+    def start(self, engine):
+        """
+        A run is starting. Call after the program and tape are loaded.
+        """
+        if self.level >= SUMMARY:
+            self.write_start(engine)
+
+
+    def step(self, engine):
+        """
+        Engine observer. engine.last holds the step.
+        """
+        self.write_step(engine)
+
+
+    def finish(self, engine, verdict=None):
+        """
+        A run has ended. verdict is the Verdict, if there is one.
+        """
+        if self.level >= SUMMARY:
+            self.write_finish(engine, verdict)
+            self.stream.flush()
+
+
+    def note(self, text):
+        """
+        A message that is not a step, e.g. a warning about the program.
+        """
+        if self.level >= SUMMARY:
+            self.write_note(text)
+
+
+    def write_start(self, engine):
+        pass
+
+
+    def write_step(self, engine):
+        pass
+
+
+    def write_finish(self, engine, verdict):
+        pass
+
+
+    def write_note(self, text):
+        pass
+
+
+class TextSink(TraceSink):
+    """
+    Human readable trace. E.g.
+
+        Start: state 0, head 0, tape 11_10
+        0: (0, 1) -> (0, 1, r) head 1 : 11_10 : State 0: Move right...
+        Program halts after 32 steps
+        Tape: 101
+    """
+    def write_start(self, engine):
+        self.stream.write("Start: state {}, head {}, tape {}\n".format(
+                engine.state, engine.head, engine.tape_string()))
+
+
+    def write_step(self, engine):
+        counter, head, p, X, q, Y, D = engine.last
+        comment = engine.program.comments.get(p)
+        self.stream.write("{}: ({}, {}) -> ({}, {}, {}) head {} : {} : {}\n"
+                .format(counter, p, X, q, Y, D, engine.head,
+                engine.tape_string(), comment or ""))
+
+
+    def write_finish(self, engine, verdict):
+        if verdict is not None:
+            self.stream.write("Program {}\n".format(verdict))
+        if engine.undefined:
+            self.stream.write("No transition for state {}, read {}\n"
+                    .format(*engine.undefined))
+        self.stream.write("Tape: {}\n".format(engine.tape_string()))
+
+
+    def write_note(self, text):
+        self.stream.write(text + "\n")
+
+
+class JsonLinesSink(TraceSink):
+    """
+    Machine readable trace. One JSON object per line, with "event" set to
+    "start", "step", "finish" or "note".
+    """
+    def write(self, record):
+        self.stream.write(json.dumps(record) + "\n")
+
+
+    def write_start(self, engine):
+        self.write({"event": "start", "state": engine.state,
+                "head": engine.head, "counter": engine.counter,
+                "tape": engine.tape_string()})
+
+
+    def write_step(self, engine):
+        counter, head, p, X, q, Y, D = engine.last
+        self.write({"event": "step", "counter": counter, "head": head,
+                "state": p, "read": X, "next": q, "write": Y, "move": D})
+
+
+    def write_finish(self, engine, verdict):
+        record = {"event": "finish", "state": engine.state,
+                "head": engine.head, "counter": engine.counter,
+                "tape": engine.tape_string(),
+                "undefined": engine.undefined}
+        if verdict is not None:
+            record.update({"verdict": verdict.kind, "period": verdict.period,
+                    "preperiod": verdict.preperiod, "shift": verdict.shift})
+        self.write(record)
+
+
+    def write_note(self, text):
+        self.write({"event": "note", "text": text})
+
+
+class BinaryTraceSink(TraceSink):
+    """
+    Record every step as a packed RECORD, with a KEYFRAME of the full
+    configuration every keyframe_interval steps, to a file at path.
+    finish() writes the index and closes the file.
+    """
+    def __init__(self, path, keyframe_interval=KEYFRAME_INTERVAL):
+        TraceSink.__init__(self, open(path, "wb"), STEP)
+        self.keyframe_interval = keyframe_interval
+        self.index = []
+        self.first = 0
+
+
+    def write_keyframe(self, engine):
+        contents = engine.tape.contents() or (0, b"")
+        self.index.append((engine.counter, self.stream.tell()))
+        self.stream.write(KEYFRAME.pack(engine.counter, engine.head,
+                engine.state_index, contents[0], len(contents[1])))
+        self.stream.write(contents[1])
+
+
+    def write_start(self, engine):
+        program = engine.program
+        meta = json.dumps({"states": program.states, "symbols": SYMBOLS,
+                "comments": program.comments,
+                "keyframe_interval": self.keyframe_interval}).encode()
+        self.stream.write(HEADER.pack(MAGIC, VERSION, len(meta)))
+        self.stream.write(meta)
+        self.first = engine.counter
+        self.write_keyframe(engine)
+
+
+    def write_step(self, engine):
+        counter, head, p, X, q, Y, D = engine.last
+        self.stream.write(RECORD.pack(counter, engine.program.state_index[p],
+                head, SYMBOL_CODE[X], SYMBOL_CODE[Y], MOVES[D]))
+        if (engine.counter - self.first) % self.keyframe_interval == 0:
+            self.write_keyframe(engine)
+
+
+    def write_finish(self, engine, verdict):
+        offset = self.stream.tell()
+        for entry in self.index:
+            self.stream.write(INDEX.pack(*entry))
+        self.stream.write(TAIL.pack(offset, len(self.index), engine.counter,
+                engine.state_index, engine.head, MAGIC))
+
+
+    def finish(self, engine, verdict=None):
+        TraceSink.finish(self, engine, verdict)
+        self.detach(engine)
+        self.stream.close()
+
+
+class TraceReader:
+    """
+    Read a binary trace file written by BinaryTraceSink. The file is memory
+    mapped, and nothing is read until a step is asked for.
+
+    first, last - counter values of the first and final configurations
+    states      - state names, by index
+    """
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        m = self.map
+        magic, version, length = HEADER.unpack_from(m, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("{} is not a version {} trace file"
+                    .format(path, VERSION))
+        if len(m) < TAIL.size or m[-8:] != MAGIC:
+            raise ValueError("{} is incomplete. The run did not finish."
+                    .format(path))
+        self.meta = json.loads(bytes(m[HEADER.size:HEADER.size + length]))
+        self.states = self.meta["states"]
+        self.comments = self.meta["comments"]
+
+        (offset, count, self.last, self.final_state, self.final_head,
+                _) = TAIL.unpack_from(m, len(m) - TAIL.size)
+        self.keyframes = [INDEX.unpack_from(m, offset + i * INDEX.size)
+                for i in range(count)]
+        self.counters = [counter for counter, _ in self.keyframes]
+        self.first = self.counters[0]
+
+
+    def __len__(self):
+        """
+        Number of steps recorded.
+        """
+        return self.last - self.first
+
+
+    def close(self):
+        self.map.close()
+
+
+    def keyframe(self, n):
+        """
+        Return (counter, head, state, left, cells, offset of the first
+        record) of the last keyframe at or before step n.
+        """
+        if not self.first <= n <= self.last:
+            raise IndexError("Step {} is not in the trace, {} to {}"
+                    .format(n, self.first, self.last))
+        offset = self.keyframes[bisect_right(self.counters, n) - 1][1]
+        counter, head, state, left, size = KEYFRAME.unpack_from(self.map, offset)
+        start = offset + KEYFRAME.size
+        return (counter, head, state, left, self.map[start:start + size],
+                start + size)
+
+
+    def record(self, n):
+        """
+        Return step n as (counter, state, head, read, write, move), the
+        state before the step and the head position it was read at. E.g.
+        (12, "1", 3, "1", "0", "l")
+        """
+        if n == self.last:
+            raise IndexError("Step {} is the final configuration".format(n))
+        counter, _, _, _, _, offset = self.keyframe(n)
+        counter, state, head, X, Y, D = RECORD.unpack_from(self.map,
+                offset + (n - counter) * RECORD.size)
+        return counter, self.states[state], head, SYMBOLS[X], SYMBOLS[Y], MOVE_NAME[D]
+
+
+    def configuration(self, n):
+        """
+        Return (state, head, tape), the configuration before step n. The
+        tape is a new Tape. n may be self.last, the final configuration.
+        """
+        counter, head, state, left, cells, offset = self.keyframe(n)
+        tape = Tape()
+        tape.restore(left, cells)
+        m = self.map
+        for i in range(n - counter):
+            _, state, head, _, Y, D = RECORD.unpack_from(m, offset + i * RECORD.size)
+            tape[head] = Y
+            head += D
+        if n > counter:
+            return self.state(n), head, tape
+        return self.states[state], head, tape
+
+
+    def state(self, n):
+        """
+        Name of the state before step n. It is in the record of step n, or
+        the tail for the final configuration.
+        """
+        if n == self.last:
+            return self.states[self.final_state]
+        return self.record(n)[1]
+
+
+if __name__ == "__main__":
+    sys.exit("\nNote: {} is a python library, and not a stand-alone program."
+            .format(sys.argv[0]))
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+#
+# turing_vector.py
+# Requires: turing_engine.py, numpy
+#
+# Run thousands of copies of the same Turing program at once. All of the
+# tapes are held in a 2D uint8 numpy array, one row per machine, and every
+# machine is advanced one step per numpy operation using the compiled
+# transition table.
+#
+"""
+Usage:
+
+    import turing_program
+    from turing_vector import VectorEngine
+
+    inputs = [bin(n)[2:] for n in range(100000)]
+    vector = VectorEngine(turing_program.function_dec(), inputs)
+    vector.run(10**6)
+    print(vector.steps[:10], vector.status(5), vector.tape_string(5))
+
+Each tape starts as with the TuringEngine: position 0 holds 0 unless the
+initial data overwrites it.
+"""
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from turing_engine import (compile_program, N_SYMBOLS, DECODE, ENCODE,
+        MAX_ITERATION, STATUS_NAME, HALTS, UNDEFINED, BUDGET)
+
+# Columns kept free either side of the heads. Growth is checked once every
+# MARGIN steps.
+MARGIN = 64
+
+# Machines are dropped from the working arrays when this fraction has
+# stopped.
+COMPACT_FRACTION = 0.25
+
+
+class VectorEngine:
+    """
+    Lockstep simulation of one program on many tapes.
+
+    Results, one entry per machine, in the order of the inputs:
+    steps  - steps executed
+    states - state index. program.states gives the name, except for
+             self.undefined, a machine that met an undefined transition.
+    heads  - head position
+    tapes  - list of final tape rows, uint8 symbol codes, filled in as each
+             machine stops, or by finish()
+    """
+    def __init__(self, program, inputs, state=0):
+        if np is None:
+            raise ImportError("turing_vector.py requires numpy. "
+                    "E.g. pip install numpy")
+        self.program = compile_program(program)
+        p = self.program
+
+        # Undefined transitions lead to an extra state, after halt, that
+        # is a fixed point like halt. Its step is not counted.
+        self.halt = p.halt
+        self.undefined = p.halt + 1
+        next_state = np.array(p.next_state, dtype=np.int32)
+        write = np.array(p.write, dtype=np.uint8)
+        delta = np.array(p.delta, dtype=np.int64)
+        missing = next_state < 0
+        next_state[missing] = self.undefined
+        write[missing] = (np.arange(len(write)) % N_SYMBOLS)[missing]
+        sink = np.arange(N_SYMBOLS)
+        self.next_state = np.concatenate(
+                [next_state, np.full(N_SYMBOLS, self.undefined, np.int32)])
+        self.write = np.concatenate([write, sink.astype(np.uint8)])
+        self.delta = np.concatenate([delta, np.zeros(N_SYMBOLS, np.int64)])
+
+        # For the lockstep loop: the next state as the offset of its row in
+        # the table, and 1 where the transition counts as a step.
+        self.next_row = self.next_state * N_SYMBOLS
+        self.counted = ((np.arange(len(self.next_state)) < self.halt * N_SYMBOLS)
+                & (self.next_state != self.undefined)).astype(np.int64)
+
+        count = len(inputs)
+        start = p.state_index.get(str(state).lower(), p.halt)
+        longest = max([len(data) for data in inputs] + [1])
+        width = longest + 2 * MARGIN
+
+        # Working arrays, only for machines that are still running.
+        self.origin = MARGIN
+        self.work_tapes = np.zeros((count, width), dtype=np.uint8)
+        for row, data in enumerate(inputs):
+            codes = (data or "0").encode().translate(ENCODE)
+            self.work_tapes[row, MARGIN:MARGIN + len(codes)] = np.frombuffer(
+                    codes, dtype=np.uint8)
+        self.work_ids = np.arange(count)
+        self.work_heads = np.full(count, MARGIN, dtype=np.int64)
+        self.work_states = np.full(count, start, dtype=np.int32)
+        self.work_steps = np.zeros(count, dtype=np.int64)
+
+        # Results
+        self.steps = np.zeros(count, dtype=np.int64)
+        self.states = np.full(count, start, dtype=np.int32)
+        self.heads = np.zeros(count, dtype=np.int64)
+        self.tapes = [None] * count
+        self.tape_origins = np.zeros(count, dtype=np.int64)
+        self.iterations = 0
+
+
+    def grow(self):
+        """
+        Make sure every head is at least MARGIN columns from either edge.
+        """
+        heads = self.work_heads
+        if len(heads) == 0:
+            return
+        width = self.work_tapes.shape[1]
+        low = int(heads.min())
+        high = int(heads.max())
+        left = max(0, MARGIN - low)
+        right = max(0, high + MARGIN - width + 1)
+        if left or right:
+            # Grow geometrically to keep the number of copies down.
+            left = max(left, width // 2) if left else 0
+            right = max(right, width // 2) if right else 0
+            self.work_tapes = np.pad(self.work_tapes, ((0, 0), (left, right)))
+            self.work_heads += left
+            self.origin += left
+
+
+    def compact(self):
+        """
+        Store the results of machines that have stopped and drop them from
+        the working arrays.
+        """
+        stopped = self.work_states >= self.halt
+        if not stopped.any():
+            return
+        ids = self.work_ids[stopped]
+        self.store(ids, stopped)
+        running = ~stopped
+        self.work_ids = self.work_ids[running]
+        self.work_tapes = self.work_tapes[running]
+        self.work_heads = self.work_heads[running]
+        self.work_states = self.work_states[running]
+        self.work_steps = self.work_steps[running]
+
+
+    def store(self, ids, mask):
+        self.steps[ids] = self.work_steps[mask]
+        self.states[ids] = self.work_states[mask]
+        self.heads[ids] = self.work_heads[mask] - self.origin
+        for i, row in zip(ids, self.work_tapes[mask]):
+            self.tapes[i] = row.copy()
+            self.tape_origins[i] = self.origin
+
+
+    def run(self, max_steps=MAX_ITERATION):
+        """
+        Advance all running machines in lockstep until they have all stopped
+        or max_steps have been executed. Returns the number of lockstep
+        iterations.
+        """
+        next_row = self.next_row
+        write = self.write
+        delta = self.delta
+        counted = self.counted
+        halt = self.halt
+        iterations = 0
+        while iterations < max_steps and len(self.work_ids):
+            # Every MARGIN steps, make room and drop stopped machines.
+            self.grow()
+            stopped = np.count_nonzero(self.work_states >= halt)
+            if stopped > COMPACT_FRACTION * len(self.work_ids):
+                self.compact()
+                continue
+
+            # Index of each head into the flattened tapes.
+            width = self.work_tapes.shape[1]
+            flat = self.work_tapes.reshape(-1)
+            base = np.arange(len(self.work_ids), dtype=np.int64) * width
+            cells = base + self.work_heads
+            rows = self.work_states * N_SYMBOLS
+            steps = self.work_steps
+
+            count = min(MARGIN, max_steps - iterations)
+            for _ in range(count):
+                k = rows + flat[cells]
+                flat[cells] = write[k]
+                cells += delta[k]
+                steps += counted[k]
+                rows = next_row[k]
+
+            self.work_states = rows // N_SYMBOLS
+            self.work_heads = cells - base
+            iterations += count
+
+        self.iterations += iterations
+        return iterations
+
+
+    def finish(self):
+        """
+        Store the results of every machine, including those still running.
+        """
+        self.compact()
+        mask = np.ones(len(self.work_ids), dtype=bool)
+        self.store(self.work_ids, mask)
+
+
+    def status(self, i):
+        """
+        "halts", "undefined" (no transition for the state and symbol read)
+        or "timeout" for machine i, as in turing_run.py.
+        """
+        state = self.states[i] if self.tapes[i] is not None else None
+        if state == self.halt:
+            return STATUS_NAME[HALTS]
+        if state == self.undefined:
+            return STATUS_NAME[UNDEFINED]
+        return STATUS_NAME[BUDGET]
+
+
+    def tape_string(self, i):
+        """
+        The final tape of machine i, ignoring leading and trailing
+        underscores. finish() must have been called if i is still running.
+        """
+        return self.tapes[i].tobytes().strip(b"\0").translate(DECODE).decode()
+
+
+    def first_field(self, i):
+        """
+        The first block of data on the final tape of machine i.
+        """
+        return self.tape_string(i).split("_")[0]
+
+
+if __name__ == "__main__":
+    sys.exit("\nNote: {} is a python library, and not a stand-alone program."
+            .format(sys.argv[0]))